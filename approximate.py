@@ -0,0 +1,210 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+import math
+
+import numpy
+
+'''
+ * Approximate solvers for games too large for any simplex backend
+ *
+ * Each method plays the game against itself, keeping only a few vectors
+ * of length m and n besides the payoff, so memory is O(m + n) on top of
+ * the payoff matrix. The averaged strategies p and q bound the value:
+ * min(p A) <= value <= max(A q), and the difference is the duality gap,
+ * which every method drives below the requested epsilon.
+ '''
+
+# Default number of iterations before giving up on reaching epsilon
+MAX_ITERATIONS = 100000
+
+'''
+ * Result of an approximate solve
+ *
+ * p1_strategy: averaged mixed strategy of the row player, float array
+ * p2_strategy: averaged mixed strategy of the column player, float array
+ * lower: value player 1 guarantees with p1_strategy, min(p A)
+ * upper: value player 2 holds player 1 to with p2_strategy, max(A q)
+ * gap: upper - lower, both strategies are gap-optimal
+ * iterations: iterations run
+ * method: name from METHODS
+ '''
+
+
+class ApproximateSolution:
+
+	def __init__(self, p1_strategy, p2_strategy, lower, upper, iterations, method):
+		self.p1_strategy = p1_strategy
+		self.p2_strategy = p2_strategy
+		self.lower = lower
+		self.upper = upper
+		self.gap = upper - lower
+		self.iterations = iterations
+		self.method = method
+
+	'''
+	* Midpoint of the value bounds, within gap / 2 of the value
+	'''
+
+	@property
+	def value(self) -> float:
+		return (self.lower + self.upper) / 2
+
+	def __repr__(self):
+		return "ApproximateSolution(value in [{:.6g}, {:.6g}], gap={:.3g}, iterations={}, method={!r})".format(
+			self.lower, self.upper, self.gap, self.iterations, self.method)
+
+
+'''
+ * Fictitious play: every round each player best responds to the other's
+ * empirical mix so far
+ *
+ * Keeps the running payoff of every row against player 2's counts and of
+ * every column against player 1's, so a round is one row and one column
+ * of the payoff added in, O(m + n). Converges slowly but never makes a
+ * pass over the whole matrix.
+ '''
+
+
+def fictitious_play(values, epsilon, max_iterations, check_every):
+	(m, n) = values.shape
+	row_counts = numpy.zeros(m)
+	col_counts = numpy.zeros(n)
+	# payoff of every row against col_counts, of every column against row_counts
+	row_totals = numpy.zeros(m)
+	col_totals = numpy.zeros(n)
+	row = 0
+	col = int(numpy.argmin(values[row]))
+
+	for iteration in range(1, max_iterations + 1):
+		row_counts[row] += 1
+		col_totals += values[row]
+		col_counts[col] += 1
+		row_totals += values[:, col]
+		(lower, upper) = (col_totals.min() / iteration, row_totals.max() / iteration)
+		if upper - lower <= epsilon:
+			break
+		row = int(numpy.argmax(row_totals))
+		col = int(numpy.argmin(col_totals))
+	return (row_counts / iteration, col_counts / iteration, iteration)
+
+
+'''
+ * Multiplicative weights (Hedge) for both players at once
+ *
+ * Each player weighs every strategy by exp(eta * its total payoff so far)
+ * with eta shrinking as sqrt(8 log(size) / t) over the payoff range, and
+ * the averages of the played mixes converge at O(sqrt(log(size) / t)).
+ '''
+
+
+def multiplicative_weights(values, epsilon, max_iterations, check_every):
+	(m, n) = values.shape
+	spread = float(values.max() - values.min()) or 1.0
+	row_totals = numpy.zeros(m)
+	col_totals = numpy.zeros(n)
+	p_sum = numpy.zeros(m)
+	q_sum = numpy.zeros(n)
+
+	for iteration in range(1, max_iterations + 1):
+		eta = math.sqrt(8 * math.log(max(m, n, 2)) / iteration) / spread
+		# shifted by the maximum so the exponentials never overflow
+		p = numpy.exp(eta * (row_totals - row_totals.max()))
+		p /= p.sum()
+		q = numpy.exp(-eta * (col_totals - col_totals.min()))
+		q /= q.sum()
+		p_sum += p
+		q_sum += q
+		row_totals += values.dot(q)
+		col_totals += p.dot(values)
+		if iteration % check_every == 0 and duality_gap(values, p_sum, q_sum) <= epsilon:
+			break
+	return (p_sum / p_sum.sum(), q_sum / q_sum.sum(), iteration)
+
+
+'''
+ * Regret matching+: each player mixes in proportion to the positive part
+ * of its cumulative regrets, clipped at 0 every round, and the averages
+ * are weighted by round number
+ *
+ * Parameter free and usually far faster in practice than the other two.
+ '''
+
+
+def regret_matching(values, epsilon, max_iterations, check_every):
+	(m, n) = values.shape
+	row_regrets = numpy.zeros(m)
+	col_regrets = numpy.zeros(n)
+	p_sum = numpy.zeros(m)
+	q_sum = numpy.zeros(n)
+	p = numpy.full(m, 1.0 / m)
+	q = numpy.full(n, 1.0 / n)
+
+	for iteration in range(1, max_iterations + 1):
+		row_payoffs = values.dot(q)
+		row_regrets = numpy.maximum(row_regrets + row_payoffs - p.dot(row_payoffs), 0.0)
+		total = row_regrets.sum()
+		p = row_regrets / total if total > 0 else numpy.full(m, 1.0 / m)
+
+		# player 2 answers player 1's new mix, the alternating form of RM+
+		col_payoffs = p.dot(values)
+		col_regrets = numpy.maximum(col_regrets + q.dot(col_payoffs) - col_payoffs, 0.0)
+		total = col_regrets.sum()
+		q = col_regrets / total if total > 0 else numpy.full(n, 1.0 / n)
+
+		p_sum += iteration * p
+		q_sum += iteration * q
+		if iteration % check_every == 0 and duality_gap(values, p_sum, q_sum) <= epsilon:
+			break
+	return (p_sum / p_sum.sum(), q_sum / q_sum.sum(), iteration)
+
+
+'''
+ * Duality gap max(A q) - min(p A) of unnormalized strategy totals
+ '''
+
+
+def duality_gap(values, p_sum, q_sum) -> float:
+	p = p_sum / p_sum.sum()
+	q = q_sum / q_sum.sum()
+	return float(values.dot(q).max() - p.dot(values).min())
+
+
+# Iteration function for each name accepted by solve_approximate
+METHODS = {
+	"fictitious": fictitious_play,
+	"hedge": multiplicative_weights,
+	"regret": regret_matching,
+}
+
+'''
+ * Approximately solves a two person, zero-sum game
+ *
+ * Stops as soon as the duality gap of the averaged strategies is at most
+ * epsilon, or after max_iterations; either way the returned bounds and gap
+ * are exact for the returned strategies. A float64 payoff (including a
+ * memory-mapped one) is used in place, anything else is converted once.
+ *
+ * payoff: m x n payoff matrix
+ * epsilon: duality gap to reach, in payoff units
+ * method: name from METHODS
+ * max_iterations: iteration limit
+ * check_every: iterations between gap checks, each costs two passes over
+ *              the payoff (fictitious play checks every round for free)
+ *
+ * return: ApproximateSolution
+ '''
+
+
+def solve_approximate(payoff, epsilon=1e-3, method="regret", max_iterations=MAX_ITERATIONS,
+						check_every=10) -> ApproximateSolution:
+	if method not in METHODS:
+		raise ValueError("Unknown approximate method {}".format(method))
+	if epsilon <= 0:
+		raise ValueError("epsilon must be positive")
+	values = numpy.asarray(payoff, dtype=numpy.float64)
+	if values.ndim != 2 or values.size == 0:
+		raise ValueError("Payoff must be a non-empty m x n matrix")
+
+	(p1_strategy, p2_strategy, iterations) = METHODS[method](values, epsilon, max_iterations, check_every)
+	lower = float(p1_strategy.dot(values).min())
+	upper = float(values.dot(p2_strategy).max())
+	return ApproximateSolution(p1_strategy, p2_strategy, lower, upper, iterations, method)
@@ -0,0 +1,140 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+import multiprocessing
+from functools import partial
+from typing import Tuple
+
+import numpy
+
+import simplex
+
+'''
+ * Solves a single game without printing anything
+ *
+ * payoff: payoff matrix, any m x n nested sequence or array
+ * backend: one of simplex.BACKENDS
+ * presolve_mode: one of presolve.PRESOLVE_MODES, None to skip presolve
+ *
+ * return: (player 1 strategy, player 2 strategy, value)
+ '''
+
+
+def solve_one(payoff, backend="float", presolve_mode=None) -> Tuple[list, list, object]:
+	values = numpy.asarray(payoff)
+	(m, n) = values.shape
+	return simplex.solve_payoff(values, m, n, backend, presolve_mode)
+
+
+'''
+ * Solves many games across a process pool
+ *
+ * Results come back in the same order as payoffs. With processes=1 the
+ * games are solved in this process, which is faster for a handful of
+ * tiny games than starting a pool.
+ *
+ * payoffs: sequence of payoff matrices, or a stacked (count, m, n) array
+ * backend: one of simplex.BACKENDS
+ * processes: pool size, defaults to the number of CPUs
+ * chunksize: games handed to a worker at a time, defaults to spreading
+ *            the games over about four chunks per worker
+ * presolve_mode: one of presolve.PRESOLVE_MODES, None to skip presolve
+ *
+ * return: list of (player 1 strategy, player 2 strategy, value)
+ '''
+
+
+def solve_games(payoffs, backend="float", processes=None, chunksize=None, presolve_mode=None) -> list:
+	if backend not in simplex.BACKENDS:
+		raise ValueError("Unknown backend {}".format(backend))
+	payoffs = list(payoffs)
+	worker = partial(solve_one, backend=backend, presolve_mode=presolve_mode)
+
+	if processes is None:
+		processes = multiprocessing.cpu_count()
+	if processes <= 1 or len(payoffs) <= 1:
+		return [worker(payoff) for payoff in payoffs]
+
+	if chunksize is None:
+		chunksize = max(1, len(payoffs) // (processes * 4))
+	with multiprocessing.Pool(processes) as pool:
+		return pool.map(worker, payoffs, chunksize)
+
+
+'''
+ * Solves a stack of same-shape games at once with the float backend
+ *
+ * All tableaus live in one (count, m+1, n+m+1) float64 array. Every step
+ * picks the entering column and ratio test row for each unfinished game
+ * and applies all of their rank-1 updates in one vectorized operation,
+ * so small games cost a few NumPy calls per pivot for the whole batch
+ * instead of per game. Games with a saddle point are answered from it.
+ *
+ * games: (count, m, n) array or sequence of same-shape payoff matrices
+ * tol: values within tol of zero are treated as zero
+ *
+ * return: (player 1 strategies (count, m), player 2 strategies (count, n),
+ *          values (count,))
+ '''
+
+
+def solve_stacked(games, tol=simplex.EPSILON) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+	values = numpy.asarray(games, dtype=numpy.float64)
+	(count, m, n) = values.shape
+
+	low = values.reshape(count, -1).min(axis=1)
+	k = numpy.where(low < 1, 1.0 - low, 0.0)
+	t = numpy.zeros((count, m + 1, n + m + 1))
+	t[:, :m, :n] = values + k[:, None, None]
+	t[:, m, :n] = -1.0
+	t[:, numpy.arange(m), n + numpy.arange(m)] = 1.0
+	t[:, :m, -1] = 1.0
+	basis = numpy.tile(numpy.arange(n, n + m), (count, 1))
+
+	# games with a saddle point never enter the pivot loop
+	saddle = (values == values.min(axis=2, keepdims=True)) & (values == values.max(axis=1, keepdims=True))
+	has_saddle = saddle.reshape(count, -1).any(axis=1)
+	active = numpy.nonzero(~has_saddle)[0]
+	while active.size > 0:
+		sub = t[active]
+		cols = numpy.argmin(sub[:, -1, :-1], axis=1)
+		entering = sub[numpy.arange(active.size), -1, cols] < -tol
+		active = active[entering]
+		if active.size == 0:
+			break
+		sub = sub[entering]
+		cols = cols[entering]
+		idx = numpy.arange(active.size)
+
+		column = sub[idx, :-1, cols]
+		candidates = column > tol
+		if not candidates.any(axis=1).all():
+			raise ValueError("Tableau is unbounded")
+		ratios = numpy.full(column.shape, numpy.inf)
+		numpy.divide(sub[:, :-1, -1], column, out=ratios, where=candidates)
+		rows = numpy.argmin(ratios, axis=1)
+
+		sub[idx, rows] /= sub[idx, rows, cols][:, None]
+		factors = sub[idx, :, cols]
+		factors[idx, rows] = 0.0
+		sub -= factors[:, :, None] * sub[idx, rows][:, None, :]
+		sub[idx, :, cols] = 0.0
+		sub[idx, rows, cols] = 1.0
+
+		t[active] = sub
+		basis[active, rows] = cols
+
+	# saddle games were never pivoted, their entries are filled in below
+	v = numpy.where(has_saddle, 1.0, t[:, m, -1])
+	game_values = (1 / v) - k
+	p1_strategies = t[:, m, n:n + m] / v[:, None]
+	p2_strategies = numpy.zeros((count, n))
+	(games_idx, rows_idx) = numpy.nonzero(basis < n)
+	p2_strategies[games_idx, basis[games_idx, rows_idx]] = t[games_idx, rows_idx, -1] / v[games_idx]
+
+	for game in numpy.nonzero(has_saddle)[0]:
+		(row, col) = numpy.argwhere(saddle[game])[0]
+		p1_strategies[game] = 0.0
+		p2_strategies[game] = 0.0
+		p1_strategies[game, row] = 1.0
+		p2_strategies[game, col] = 1.0
+		game_values[game] = values[game, row, col]
+	return (p1_strategies, p2_strategies, game_values)
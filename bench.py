@@ -0,0 +1,440 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy
+
+import certify
+import parallel
+import revised
+import simplex
+import sparse
+
+# Game families the generators below can produce
+GENERATORS = ("dense", "sparse", "skewed", "degenerate", "saddle", "no_saddle")
+
+# Pivots per row and column after which a case is reported as cycling
+PIVOT_LIMIT = 50
+
+# Backends that run a solver object instead of a tableau; they ignore the
+# pivot rule and have nothing to render
+SOLVERS = {
+	"revised": revised.RevisedSimplex,
+	"sparse": sparse.SparseSimplex,
+	"hybrid": certify.HybridSimplex,
+}
+
+'''
+ * Class for storing the result of parsing bench's command line arguments
+ *
+ * success: parsing of command line arguments was successful
+ * sizes: square game sizes to run
+ * backends: simplex.BACKENDS to run
+ * generators: GENERATORS to run
+ * rules: simplex.PIVOT_RULES to run on the tableau backends
+ * seed: seed for the game generators
+ * repeat: timing runs per case, the fastest one is kept
+ * out: file the JSON results are written to, None for stdout
+ * baseline: JSON results to compare against, None to skip
+ * tolerance: allowed slowdown against the baseline, 0.25 is 25%
+ * threads: also check that simplex --threads=N answers like the serial
+ *          command line, None to skip
+ '''
+
+
+class BenchArgs:
+
+	def __init__(self):
+		self.sizes = [5, 10, 20]
+		self.backends = list(simplex.BACKENDS)
+		self.generators = list(GENERATORS)
+		self.rules = ["dantzig"]
+		self.seed = 0
+		self.repeat = 3
+		self.out = None
+		self.baseline = None
+		self.tolerance = 0.25
+		self.threads = None
+		self.success = False
+
+
+'''
+ * Builds a seeded random game of one of the GENERATORS families
+ *
+ * kind: name from GENERATORS
+ * m: number of rows
+ * n: number of columns
+ * rng: numpy.random.Generator
+ *
+ * return: m x n integer payoff matrix
+ '''
+
+
+def generate_game(kind, m, n, rng):
+	if kind == "dense":
+		return rng.integers(-100, 101, (m, n))
+	if kind == "sparse":
+		mask = rng.random((m, n)) < 0.1
+		return numpy.where(mask, rng.integers(-100, 101, (m, n)), 0)
+	if kind == "skewed":
+		magnitude = numpy.floor(rng.lognormal(0.0, 2.0, (m, n)))
+		return (numpy.where(rng.random((m, n)) < 0.3, -1, 1) * magnitude).astype(numpy.int64)
+	if kind == "degenerate":
+		return rng.integers(-1, 2, (m, n))
+	if kind == "saddle":
+		payoff = rng.integers(-100, 101, (m, n))
+		(row, col) = (rng.integers(m), rng.integers(n))
+		# row above the saddle value everywhere, column below it
+		payoff[row] = numpy.abs(payoff[row])
+		payoff[:, col] = -numpy.abs(payoff[:, col])
+		payoff[row, col] = 0
+		return payoff
+	if kind == "no_saddle":
+		while True:
+			payoff = rng.integers(-100, 101, (m, n))
+			if not simplex.find_saddles(payoff, m, n):
+				return payoff
+	raise ValueError("Unknown generator {}".format(kind))
+
+
+'''
+ * Solves one game on one backend, timing every phase
+ *
+ * payoff: payoff matrix
+ * backend: one of simplex.BACKENDS
+ * rule: name from simplex.PIVOT_RULES, ignored by the SOLVERS backends
+ *
+ * return: dict of phase timings in seconds, pivot count and value
+ *
+ * raises: ArithmeticError if the backend failed or exceeded PIVOT_LIMIT
+ '''
+
+
+def run_case(payoff, backend, rule="dantzig") -> dict:
+	(m, n) = payoff.shape
+	timings = {}
+
+	start = time.perf_counter()
+	if backend in SOLVERS:
+		solver = SOLVERS[backend](payoff, m, n)
+	else:
+		tableau = simplex.get_init_tableau(payoff, m, n, backend)
+	timings["init"] = time.perf_counter() - start
+
+	start = time.perf_counter()
+	pivots = 0
+	limit = PIVOT_LIMIT * (m + n)
+	if backend in SOLVERS:
+		while solver.pivot()[0] >= 0:
+			pivots += 1
+			if pivots > limit:
+				raise ArithmeticError("No optimum after {} pivots".format(limit))
+	else:
+		pivot_rule = simplex.PIVOT_RULES[rule]()
+		update = simplex.PIVOT_UPDATES[backend]
+		while not simplex.tableau_finished(tableau):
+			update(tableau, *pivot_rule.select(tableau))
+			pivots += 1
+			if pivots > limit:
+				raise ArithmeticError("No optimum after {} pivots".format(limit))
+	timings["pivot"] = time.perf_counter() - start
+
+	start = time.perf_counter()
+	if backend in SOLVERS:
+		(_, _, value) = solver.get_strategies()
+	else:
+		(_, _, value) = simplex.get_strategies(tableau)
+	timings["extract"] = time.perf_counter() - start
+
+	start = time.perf_counter()
+	if backend not in SOLVERS:
+		str(tableau)
+	timings["render"] = time.perf_counter() - start
+
+	timings["pivots"] = pivots
+	timings["value"] = float(value)
+	return timings
+
+
+'''
+ * Measures the peak traced memory of solving one game on one backend
+ *
+ * return: peak bytes allocated while solving
+ '''
+
+
+def measure_memory(payoff, backend, rule="dantzig") -> int:
+	tracemalloc.start()
+	try:
+		run_case(payoff, backend, rule)
+		(_, peak) = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+	return peak
+
+
+'''
+ * Runs every requested (generator, size, backend) case
+ *
+ * args: bench arguments
+ *
+ * A case whose backend raises is recorded with its error instead of
+ * timings, so one broken backend does not hide the others.
+ *
+ * return: JSON-ready dict with run metadata and one entry per case
+ '''
+
+
+def run_benchmarks(args: BenchArgs) -> dict:
+	results = []
+	for kind in args.generators:
+		for size in args.sizes:
+			rng = numpy.random.default_rng([args.seed, GENERATORS.index(kind), size])
+			payoff = generate_game(kind, size, size, rng)
+			cases = [(backend, rule) for backend in args.backends if backend not in SOLVERS for rule in args.rules]
+			cases += [(backend, "dantzig") for backend in args.backends if backend in SOLVERS]
+			for (backend, rule) in cases:
+				case = {"generator": kind, "size": size, "backend": backend, "rule": rule}
+				try:
+					runs = [run_case(payoff, backend, rule) for _ in range(args.repeat)]
+				except (ArithmeticError, ValueError) as error:
+					case["error"] = str(error)
+					results.append(case)
+					print("{:>10} {:>5} {:>9} {:>8} failed: {}".format(kind, size, backend, rule, error), file=sys.stderr)
+					continue
+				best = min(runs, key=lambda run: run["init"] + run["pivot"] + run["extract"])
+				case.update({
+					"wall": best["init"] + best["pivot"] + best["extract"],
+					"phases": {phase: best[phase] for phase in ("init", "pivot", "extract", "render")},
+					"pivots": best["pivots"],
+					"peak_bytes": measure_memory(payoff, backend, rule),
+					"value": best["value"],
+				})
+				results.append(case)
+				print("{:>10} {:>5} {:>9} {:>8} {:>10.4f}s {:>6} pivots".format(
+					kind, size, backend, rule, case["wall"], best["pivots"]), file=sys.stderr)
+
+	return {
+		"meta": {
+			"python": platform.python_version(),
+			"numpy": numpy.__version__,
+			"machine": platform.machine(),
+			"seed": args.seed,
+			"repeat": args.repeat,
+		},
+		"results": results,
+	}
+
+
+'''
+ * Compares a run against a stored baseline
+ *
+ * A case regresses when its wall time grew by more than tolerance, its
+ * pivot count grew, or its peak memory grew by more than tolerance.
+ * A case that failed now but not in the baseline is also a regression.
+ * Cases missing from either side are ignored.
+ *
+ * current: results from run_benchmarks
+ * baseline: results loaded from an earlier run
+ * tolerance: allowed relative growth, 0.25 is 25%
+ *
+ * return: list of human readable regression descriptions
+ '''
+
+
+def compare_results(current, baseline, tolerance) -> list:
+	def key(entry):
+		return (entry["generator"], entry["size"], entry["backend"], entry.get("rule", "dantzig"))
+
+	old = {key(entry): entry for entry in baseline["results"]}
+	regressions = []
+	for entry in current["results"]:
+		before = old.get(key(entry))
+		if before is None:
+			continue
+		name = "{} {}x{} {} {}".format(entry["generator"], entry["size"], entry["size"], entry["backend"], entry["rule"])
+		if "error" in entry:
+			if "error" not in before:
+				regressions.append("{}: failed with {}".format(name, entry["error"]))
+			continue
+		if "error" in before:
+			continue
+		if entry["wall"] > before["wall"] * (1 + tolerance):
+			regressions.append("{}: wall {:.4f}s -> {:.4f}s".format(name, before["wall"], entry["wall"]))
+		if entry["pivots"] > before["pivots"]:
+			regressions.append("{}: pivots {} -> {}".format(name, before["pivots"], entry["pivots"]))
+		if entry["peak_bytes"] > before["peak_bytes"] * (1 + tolerance):
+			regressions.append("{}: peak memory {} -> {} bytes".format(name, before["peak_bytes"], entry["peak_bytes"]))
+	return regressions
+
+
+'''
+ * Solves a game with the simplex command line, quietly
+ *
+ * path: .npy file holding the payoff
+ * options: extra command line options
+ *
+ * return: the command line's output
+ '''
+
+
+def run_cli(path, backend, options=()) -> str:
+	script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simplex.py")
+	command = [sys.executable, script, "--quiet", "--backend=" + backend, "--payoff=" + path] + list(options)
+	return subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=False, text=True).stdout
+
+
+'''
+ * Checks that the command line answers every case the same with
+ * --threads=N as with the serial update
+ *
+ * It runs simplex.py itself rather than calling simplex, since only then is
+ * simplex loaded as __main__ the way users run it. Besides the square
+ * games of run_benchmarks, the float and exact backends get a game of
+ * parallel.MIN_PARALLEL_ROWS more rows than columns, so that the threaded
+ * update really runs.
+ *
+ * return: list of human readable mismatch descriptions
+ '''
+
+
+def check_threads(args: BenchArgs) -> list:
+	cases = []
+	for kind in args.generators:
+		for size in args.sizes:
+			rng = numpy.random.default_rng([args.seed, GENERATORS.index(kind), size])
+			cases += [(kind, generate_game(kind, size, size, rng), args.backends)]
+	for size in args.sizes:
+		rng = numpy.random.default_rng([args.seed, size])
+		tall = [backend for backend in args.backends if backend in ("float", "exact")]
+		cases += [("tall", generate_game("dense", parallel.MIN_PARALLEL_ROWS + size, size, rng), tall)]
+
+	mismatches = []
+	with tempfile.TemporaryDirectory() as directory:
+		path = os.path.join(directory, "payoff.npy")
+		for (kind, payoff, backends) in cases:
+			numpy.save(path, payoff)
+			for backend in backends:
+				serial = run_cli(path, backend)
+				threaded = run_cli(path, backend, ["--threads={}".format(args.threads)])
+				name = "{} {}x{} {}".format(kind, payoff.shape[0], payoff.shape[1], backend)
+				if threaded != serial:
+					mismatches.append("{}: --threads={} answered differently".format(name, args.threads))
+				print("{:>22} threads {}".format(name, "ok" if threaded == serial else "MISMATCH"), file=sys.stderr)
+	return mismatches
+
+
+'''
+ * Print the usage statement for bench.
+ '''
+
+
+def print_usage():
+	print("usage: bench [options]")
+	print("options:")
+	print("\t--sizes=N,N,...: square game sizes, default 5,10,20")
+	print("\t--backends=NAME,...: backends to run, default {}".format(",".join(simplex.BACKENDS)))
+	print("\t--generators=NAME,...: game families, default {}".format(",".join(GENERATORS)))
+	print("\t--rules=NAME,...: tableau pivot rules, default dantzig")
+	print("\t--seed=N: generator seed, default 0")
+	print("\t--repeat=N: timing runs per case, default 3")
+	print("\t--out=FILE: write JSON results to FILE instead of stdout")
+	print("\t--baseline=FILE: compare against earlier JSON results")
+	print("\t--tolerance=X: allowed slowdown against the baseline, default 0.25")
+	print("\t--threads=N: also check that simplex --threads=N answers like the")
+	print("\t             serial command line on every backend")
+
+
+'''
+ * Parses bench's command line arguments.
+ *
+ * argc: number of command line arguments
+ * argv: array of string tokens
+ *
+ * return: bench arguments structure
+ '''
+
+
+def parse_args(argc: int, argv: list) -> BenchArgs:
+	result = BenchArgs()
+	try:
+		for token in argv[1:argc]:
+			name, _, value = token.lstrip("-").partition("=")
+			assert token.startswith("--") and value
+			if name == "sizes":
+				result.sizes = [int(size) for size in value.split(",")]
+				assert all(size > 0 for size in result.sizes)
+			elif name == "backends":
+				result.backends = value.split(",")
+				assert all(backend in simplex.BACKENDS for backend in result.backends)
+			elif name == "generators":
+				result.generators = value.split(",")
+				assert all(kind in GENERATORS for kind in result.generators)
+			elif name == "rules":
+				result.rules = value.split(",")
+				assert all(rule in simplex.PIVOT_RULES for rule in result.rules)
+			elif name == "seed":
+				result.seed = int(value)
+			elif name == "repeat":
+				result.repeat = int(value)
+				assert result.repeat > 0
+			elif name == "out":
+				result.out = value
+			elif name == "baseline":
+				result.baseline = value
+			elif name == "tolerance":
+				result.tolerance = float(value)
+			elif name == "threads":
+				result.threads = int(value)
+				assert result.threads > 1
+			else:
+				return result
+	except (ValueError, AssertionError):
+		return result
+
+	result.success = True
+	return result
+
+
+'''
+ * Runs the benchmarks, saves them and checks them against a baseline.
+ *
+ * return: 0 on success, 1 if the baseline comparison found regressions
+ *         or a threaded run answered differently
+ '''
+
+
+def main():
+	args = parse_args(len(sys.argv), sys.argv)
+	if not args.success:
+		print_usage()
+		return -1
+
+	current = run_benchmarks(args)
+	if args.out is None:
+		print(json.dumps(current, indent=2))
+	else:
+		with open(args.out, "w") as out:
+			json.dump(current, out, indent=2)
+
+	regressions = []
+	if args.baseline is not None:
+		with open(args.baseline) as baseline_file:
+			baseline = json.load(baseline_file)
+		regressions = compare_results(current, baseline, args.tolerance)
+	for regression in regressions:
+		print("REGRESSION " + regression, file=sys.stderr)
+	mismatches = check_threads(args) if args.threads is not None else []
+	for mismatch in mismatches:
+		print("MISMATCH " + mismatch, file=sys.stderr)
+	return 1 if regressions or mismatches else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,226 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from fractions import Fraction
+
+import numpy
+
+import presolve
+import simplex
+
+# Default memory budget of a SolutionCache, in pickled bytes
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# Passes of alternately sorting rows and columns when canonicalizing
+SORT_PASSES = 4
+
+'''
+ * A payoff matrix brought to canonical form
+ *
+ * Adding a constant to every payoff adds it to the value and leaves the
+ * optimal strategies alone, and permuting rows or columns permutes the
+ * strategies, so games that differ only that way share one canonical
+ * form and one cached solution.
+ *
+ * payoff: canonical payoff, smallest entry 0
+ * shift: smallest entry of the original payoff, value = canonical + shift
+ * rows: original index of every canonical row
+ * cols: original index of every canonical column
+ * key: hex digest identifying the canonical payoff
+ '''
+
+
+class Canonical:
+
+	def __init__(self, payoff, shift, rows, cols, key):
+		self.payoff = payoff
+		self.shift = shift
+		self.rows = rows
+		self.cols = cols
+		self.key = key
+
+	'''
+	* Maps a solution of the canonical game back to the original game
+	*
+	* return: GameSolution of the original game
+	'''
+
+	def expand(self, solution: simplex.GameSolution) -> simplex.GameSolution:
+		(m, n) = self.payoff.shape
+		order = presolve.Presolved(self.payoff, self.rows, self.cols, m, n)
+		(p1_strategy, p2_strategy) = order.expand(solution.p1_strategy, solution.p2_strategy)
+		basis = None if solution.basis is None else order.expand_basis(solution.basis)
+		# a float shift must not turn an exact value into a float
+		shift = Fraction(self.shift) if isinstance(solution.value, Fraction) else self.shift
+		return simplex.GameSolution(p1_strategy, p2_strategy, solution.value + shift, solution.pivots, basis,
+									solution.backend)
+
+
+'''
+ * Orders the rows of a block by their sorted entries, which no column
+ * permutation changes, then lexicographically to break ties
+ *
+ * return: list of row indices in sorted order
+ '''
+
+
+def sorted_rows(block) -> list:
+	return sorted(range(block.shape[0]), key=lambda row: (sorted(block[row]), tuple(block[row])))
+
+
+'''
+ * Brings a payoff to canonical form
+ *
+ * The payoff is shifted so its smallest entry is 0. With permute, rows and
+ * columns are then sorted, alternately, until neither order changes.
+ * Sorting is not a complete canonical form under every permutation (that
+ * is as hard as graph isomorphism), so a permuted copy can occasionally
+ * miss the cache, but a hit is always a correct answer since the recorded
+ * order maps it back. With exact, float entries become Fractions before
+ * the shift, so rounding in the shift cannot change an exact answer.
+ *
+ * payoff: m x n payoff matrix, numeric or holding Fractions
+ * permute: also sort rows and columns
+ * exact: shift in exact arithmetic, for the backends that answer exactly
+ *
+ * return: Canonical form of the payoff
+ '''
+
+
+def canonicalize(payoff, permute=False, exact=False) -> Canonical:
+	values = numpy.asarray(payoff)
+	if values.dtype.kind in "ub":
+		values = values.astype(numpy.int64)
+	if exact and values.dtype.kind in "fO":
+		values = numpy.array([[Fraction(entry) for entry in row] for row in values.tolist()], dtype=object)
+	shift = values.min()
+	if values.dtype.kind == "i":
+		shift = int(shift)
+	elif values.dtype.kind == "f":
+		shift = float(shift)
+	block = values - shift
+	(m, n) = block.shape
+	rows = list(range(m))
+	cols = list(range(n))
+
+	if permute:
+		for _ in range(SORT_PASSES):
+			row_order = sorted_rows(block)
+			block = block[row_order]
+			rows = [rows[row] for row in row_order]
+			col_order = sorted_rows(block.T)
+			block = block[:, col_order]
+			cols = [cols[col] for col in col_order]
+			if row_order == sorted(row_order) and col_order == sorted(col_order):
+				break
+
+	digest = hashlib.sha256("{} {} {}".format(m, n, block.dtype.kind).encode())
+	if block.dtype == object:
+		digest.update(" ".join(str(Fraction(entry)) for entry in block.flat).encode())
+	else:
+		digest.update(numpy.ascontiguousarray(block).tobytes())
+	return Canonical(block, shift, rows, cols, digest.hexdigest())
+
+
+'''
+ * Least recently used cache of game solutions in front of the solver
+ *
+ * Solutions are stored for the canonical form of their game, so a game
+ * seen before, up to a constant shift (and, with permute, a reordering of
+ * rows and columns), is answered without building a tableau. Entries are
+ * evicted oldest first once their pickled size passes max_bytes. With a
+ * path, every solution is also written there, one file per game, and
+ * looked up on a memory miss, so the cache survives restarts; only point
+ * it at a directory you trust, since entries are unpickled.
+ *
+ * max_bytes: memory budget of the in-memory entries
+ * path: directory of the on-disk store, None for memory only
+ * permute: canonicalize row and column order too
+ * entries: key -> (pickled size, canonical GameSolution), oldest first
+ * size: pickled bytes held in entries
+ * hits: lookups answered from memory or disk
+ * misses: lookups that had to solve
+ '''
+
+
+class SolutionCache:
+
+	def __init__(self, max_bytes=DEFAULT_MAX_BYTES, path=None, permute=False):
+		self.max_bytes = max_bytes
+		self.path = path
+		self.permute = permute
+		self.entries = OrderedDict()
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+		if path is not None:
+			os.makedirs(path, exist_ok=True)
+
+	def __len__(self):
+		return len(self.entries)
+
+	'''
+	* Solves a game, or answers it from the cache
+	*
+	* Arguments are those of simplex.solve_game; the backend and presolve
+	* mode are part of the key, the pivot rule is not since every rule
+	* finds an optimal solution.
+	*
+	* return: GameSolution of payoff
+	'''
+
+	def solve(self, payoff, backend="exact", presolve_mode=None, pivot_rule="dantzig") -> simplex.GameSolution:
+		canonical = canonicalize(payoff, self.permute, backend not in ("float", "revised"))
+		key = "{}-{}-{}".format(canonical.key, backend, presolve_mode or "none")
+		solution = self.lookup(key)
+		if solution is None:
+			self.misses += 1
+			solution = simplex.solve_game(canonical.payoff, backend, presolve_mode, pivot_rule)
+			self.store(key, solution)
+		else:
+			self.hits += 1
+		return canonical.expand(solution)
+
+	'''
+	* Finds a canonical solution in memory, then on disk
+	*
+	* return: GameSolution, None on a miss
+	'''
+
+	def lookup(self, key):
+		if key in self.entries:
+			self.entries.move_to_end(key)
+			return self.entries[key][1]
+		if self.path is None:
+			return None
+		try:
+			with open(os.path.join(self.path, key + ".pickle"), "rb") as file:
+				data = file.read()
+		except FileNotFoundError:
+			return None
+		solution = pickle.loads(data)
+		self.remember(key, solution, len(data))
+		return solution
+
+	def store(self, key, solution):
+		data = pickle.dumps(solution)
+		self.remember(key, solution, len(data))
+		if self.path is not None:
+			# written aside and renamed so a reader never sees half a file
+			target = os.path.join(self.path, key + ".pickle")
+			with open(target + ".tmp", "wb") as file:
+				file.write(data)
+			os.replace(target + ".tmp", target)
+
+	def remember(self, key, solution, size):
+		self.entries[key] = (size, solution)
+		self.size += size
+		while self.size > self.max_bytes and len(self.entries) > 1:
+			(_, (old_size, _)) = self.entries.popitem(last=False)
+			self.size -= old_size
+
+	def clear(self):
+		self.entries.clear()
+		self.size = 0
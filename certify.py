@@ -0,0 +1,186 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+from fractions import Fraction
+from typing import Tuple
+
+import revised
+import simplex
+
+'''
+ * Hybrid solver: pivots in floats, answers in exact Fractions
+ *
+ * Exact arithmetic on every pivot is what makes the exact backends slow,
+ * but only the final basis decides the answer. So the revised simplex
+ * finds an optimal basis in floats, and the strategies of that basis are
+ * then computed exactly by solving only its kernel: the basic payoff
+ * columns against the rows whose slack is not basic, a system the size
+ * of the support. The result is checked in exact arithmetic against the
+ * whole payoff (p A >= v and A q <= v), which proves it optimal whatever
+ * round-off the float pivots made. Only if the check fails does the exact
+ * backend pivot, starting from the float basis.
+ '''
+
+'''
+ * Brings the given variables into the basis of an exact tableau by
+ * Gaussian elimination: each one enters a row whose basic variable is not
+ * wanted, on any nonzero entry. A negative pivot leaves a negative shared
+ * denominator, which is turned positive again so the tableau keeps the
+ * signs every pivot rule reads.
+ *
+ * tableau: exact tableau, pivoted in place
+ * entering: variables to make basic
+ *
+ * return: True when every variable entered, False for a singular basis
+ '''
+
+
+def pivot_into_basis(tableau: simplex.ExactTableau, entering) -> bool:
+	wanted = set(entering)
+	for var in entering:
+		if var in tableau.basis:
+			continue
+		rows = [row for row in range(tableau.s_size) if tableau.basis[row] not in wanted and tableau.m[row][var] != 0]
+		if not rows:
+			return False
+		simplex.apply_exact_pivot(tableau, rows[0], var)
+		if tableau.d < 0:
+			tableau.m = -tableau.m
+			tableau.d = -tableau.d
+	return True
+
+
+'''
+ * Booster of the exact backend, which makes every payoff entry at least 1
+ '''
+
+
+def booster(values) -> Fraction:
+	low = min(min(row) for row in values)
+	return Fraction(1 - low) if low < 1 else Fraction(0)
+
+
+'''
+ * Exact strategies and value of a basis of the game LP, from its kernel
+ *
+ * values: payoff as nested lists of exact numbers
+ * basis: basis[row] is the variable basic in that row, x_j as j and s_i
+ *        as n + i
+ *
+ * return: (player 1 strategy, player 2 strategy, value), None when the
+ *         kernel is not square or singular
+ '''
+
+
+def solve_basis(values, m, n, basis):
+	cols = sorted(var for var in basis if var < n)
+	rows = [row for row in range(m) if n + row not in basis]
+	if len(rows) != len(cols) or not cols:
+		return None
+
+	# boosted by the full game's booster, so the kernel game needs none
+	k = booster(values)
+	kernel = [[Fraction(values[row][col]) + k for col in cols] for row in rows]
+	size = len(cols)
+	tableau = simplex.get_init_exact_tableau(kernel, size, size)
+	if not pivot_into_basis(tableau, range(size)):
+		return None
+
+	(kernel_p1, kernel_p2, kernel_value) = simplex.get_exact_strategies(tableau)
+	p1_strategy = [Fraction(0)] * m
+	p2_strategy = [Fraction(0)] * n
+	for (row, p) in zip(rows, kernel_p1):
+		p1_strategy[row] = p
+	for (col, q) in zip(cols, kernel_p2):
+		p2_strategy[col] = q
+	return (p1_strategy, p2_strategy, kernel_value - k)
+
+
+'''
+ * Checks exactly that strategies are optimal with the given value:
+ * both are probability vectors, every column pays player 1 at least value
+ * against p1_strategy and every row at most value against p2_strategy
+ *
+ * Only the rows and columns in a strategy's support are summed over.
+ '''
+
+
+def is_optimal(values, p1_strategy, p2_strategy, value) -> bool:
+	if min(p1_strategy) < 0 or min(p2_strategy) < 0 or sum(p1_strategy) != 1 or sum(p2_strategy) != 1:
+		return False
+	p1_support = [(row, p) for (row, p) in enumerate(p1_strategy) if p != 0]
+	p2_support = [(col, q) for (col, q) in enumerate(p2_strategy) if q != 0]
+	for col in range(len(p2_strategy)):
+		if sum(p * values[row][col] for (row, p) in p1_support) < value:
+			return False
+	for row in range(len(p1_strategy)):
+		if sum(q * values[row][col] for (col, q) in p2_support) > value:
+			return False
+	return True
+
+
+'''
+ * Float-then-exact solver with the interface of revised.RevisedSimplex
+ *
+ * The pivots are the revised simplex's, in floats; get_strategies turns
+ * the final basis into exact strategies and certifies them, or pivots
+ * the exact backend from that basis when the certificate fails.
+ *
+ * solver: revised.RevisedSimplex doing the float pivots
+ * certified: whether the float basis passed the exact check, None
+ *            before get_strategies
+ * exact_pivots: exact pivots spent after a failed check
+ '''
+
+
+class HybridSimplex:
+
+	def __init__(self, payoff, m, n):
+		self.values = [[Fraction(entry) for entry in row] for row in simplex.as_python_payoff(payoff)]
+		self.m = m
+		self.n = n
+		self.solver = revised.RevisedSimplex(payoff, m, n)
+		self.certified = None
+		self.exact_pivots = 0
+		self.exact_basis = None
+
+	@property
+	def basis(self) -> list:
+		return self.solver.basis if self.exact_basis is None else self.exact_basis
+
+	@property
+	def pivot_count(self) -> int:
+		return self.solver.pivot_count + self.exact_pivots
+
+	def select_pivot(self):
+		return self.solver.select_pivot()
+
+	def replace(self, pivot_row, entering, w):
+		self.solver.replace(pivot_row, entering, w)
+
+	def pivot(self) -> Tuple[int, int]:
+		return self.solver.pivot()
+
+	def objective(self) -> float:
+		return self.solver.objective()
+
+	'''
+	* Exact optimal strategies and value
+	*
+	* return: (player 1 strategy, player 2 strategy, value), Fractions
+	'''
+
+	def get_strategies(self) -> Tuple[list, list, Fraction]:
+		strategies = solve_basis(self.values, self.m, self.n, self.solver.basis)
+		if strategies is not None and is_optimal(self.values, *strategies):
+			self.certified = True
+			return strategies
+
+		self.certified = False
+		tableau = simplex.get_init_exact_tableau(self.values, self.m, self.n)
+		# a float basis that is singular or infeasible in exact arithmetic
+		# is no place to start from, the slack basis is
+		entering = [var for var in self.solver.basis if var < self.n]
+		if not pivot_into_basis(tableau, entering) or min(tableau.m[:-1, -1]) < 0:
+			tableau = simplex.get_init_exact_tableau(self.values, self.m, self.n)
+		self.exact_pivots = simplex.pivot_until_optimal(tableau, "exact")
+		self.exact_basis = [int(var) for var in tableau.basis]
+		return simplex.get_exact_strategies(tableau)
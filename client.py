@@ -0,0 +1,119 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+import itertools
+import json
+import socket
+
+import numpy
+
+import server
+import simplex
+
+'''
+ * Client of a running solver server (server.py)
+ *
+ * Keeps one connection open and speaks the server's line protocol.
+ * solve sends one game and waits for it; solve_many sends every game
+ * before reading any answer, so the server can batch them, and returns
+ * the answers in input order. Not safe to share between threads, open
+ * one client per thread instead.
+ *
+ * path: Unix socket path, or None to connect to host:port
+ * timeout: socket timeout in seconds, None to wait forever
+ '''
+
+
+class SolverClient:
+
+	def __init__(self, path=None, host="127.0.0.1", port=8765, timeout=None):
+		if path is not None:
+			self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+			self.sock.settimeout(timeout)
+			self.sock.connect(path)
+		else:
+			self.sock = socket.create_connection((host, port), timeout)
+		self.file = self.sock.makefile("rwb")
+		self.ids = itertools.count()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def close(self):
+		self.file.close()
+		self.sock.close()
+
+	'''
+	* Solves one game on the server
+	*
+	* Arguments are those of simplex.solve_game.
+	*
+	* return: simplex.GameSolution, exact values as Fractions
+	'''
+
+	def solve(self, payoff, backend="exact", presolve_mode=None, pivot_rule="dantzig") -> simplex.GameSolution:
+		return self.solve_many([payoff], backend, presolve_mode, pivot_rule)[0]
+
+	'''
+	* Solves many games on the server, pipelined on this connection
+	*
+	* return: list of simplex.GameSolution in the order of payoffs
+	'''
+
+	def solve_many(self, payoffs, backend="exact", presolve_mode=None, pivot_rule="dantzig") -> list:
+		ids = []
+		for payoff in payoffs:
+			rows = numpy.asarray(payoff).tolist()
+			ids.append(self.send({
+				"payoff": [[server.encode_number(entry) for entry in row] for row in rows],
+				"backend": backend,
+				"presolve": presolve_mode,
+				"pivot_rule": pivot_rule,
+			}))
+		self.file.flush()
+
+		responses = {}
+		while len(responses) < len(ids):
+			response = self.receive()
+			responses[response["id"]] = response
+		return [to_solution(responses[request_id]) for request_id in ids]
+
+	'''
+	* Latency and throughput counters of the server, see
+	* server.ServerStats.snapshot
+	'''
+
+	def stats(self) -> dict:
+		request_id = self.send({"op": "stats"})
+		self.file.flush()
+		response = self.receive()
+		while response["id"] != request_id:
+			response = self.receive()
+		return response["stats"]
+
+	def send(self, request) -> int:
+		request_id = next(self.ids)
+		self.file.write((json.dumps(dict(request, id=request_id)) + "\n").encode())
+		return request_id
+
+	def receive(self) -> dict:
+		line = self.file.readline()
+		if not line:
+			raise ConnectionError("Server closed the connection")
+		return json.loads(line)
+
+
+'''
+ * GameSolution from a server response
+ *
+ * Raises ValueError with the server's message for an error response.
+ '''
+
+
+def to_solution(response) -> simplex.GameSolution:
+	if "error" in response:
+		raise ValueError(response["error"])
+	return simplex.GameSolution([server.decode_number(p) for p in response["p1"]],
+								[server.decode_number(q) for q in response["p2"]], server.decode_number(response["value"]),
+								response["pivots"], response["basis"], response["backend"])
@@ -0,0 +1,265 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+import numpy
+
+import revised
+import simplex
+
+'''
+ * Double oracle solver for games whose strategy sets are too large to
+ * write out
+ *
+ * The game is given by an oracle instead of a payoff matrix. The solver
+ * keeps a restricted game over a few rows and columns, solves it with the
+ * simplex machinery, and asks each player's best response oracle for the
+ * strategy that does best against the other player's restricted optimum.
+ * Those strategies bound the value of the full game; while the bounds
+ * differ, the best responses join the restricted game and it is solved
+ * again. Only the payoffs between the chosen rows and columns are ever
+ * evaluated, so time and memory grow with the support of the solution
+ * rather than with the size of the game.
+ '''
+
+# Default number of restricted games solved before giving up
+MAX_ITERATIONS = 1000
+
+# Backends whose solutions are exact, so the bounds may be required to meet
+EXACT_BACKENDS = ("fraction", "exact", "sparse", "hybrid")
+
+'''
+ * A game given by its payoff and best response functions
+ *
+ * Strategies can be any hashable values. Subclasses implement all three
+ * methods.
+ '''
+
+
+class GameOracle:
+
+	'''
+	* Payoff to player 1 when row meets col
+	'''
+
+	def payoff(self, row, col):
+		raise NotImplementedError
+
+	'''
+	* Player 1's best response to player 2 mixing the columns cols with
+	* probabilities q, the row maximizing sum(q[j] * payoff(row, cols[j]))
+	'''
+
+	def best_row(self, cols, q):
+		raise NotImplementedError
+
+	'''
+	* Player 2's best response to player 1 mixing the rows rows with
+	* probabilities p, the column minimizing sum(p[i] * payoff(rows[i], col))
+	'''
+
+	def best_col(self, rows, p):
+		raise NotImplementedError
+
+
+'''
+ * Oracle over an explicit payoff matrix, strategies being row and column
+ * indices; mostly useful to check the solver against simplex.solve_game
+ *
+ * values: m x n payoff matrix
+ '''
+
+
+class MatrixOracle(GameOracle):
+
+	def __init__(self, payoff):
+		self.values = numpy.asarray(payoff)
+
+	def payoff(self, row, col):
+		return self.values[row, col]
+
+	def best_row(self, cols, q):
+		return int(numpy.argmax(self.values[:, cols].dot(numpy.asarray(q))))
+
+	def best_col(self, rows, p):
+		return int(numpy.argmin(numpy.asarray(p).dot(self.values[rows])))
+
+
+'''
+ * Result of a double oracle solve
+ *
+ * rows: row strategies of the final restricted game, in the order added
+ * cols: column strategies of the final restricted game
+ * p1_strategy: probability of every strategy in rows
+ * p2_strategy: probability of every strategy in cols
+ * lower: value player 1 guarantees with p1_strategy in the full game
+ * upper: value player 2 holds player 1 to with p2_strategy
+ * gap: upper - lower, 0 once the solve converged on an exact backend
+ * iterations: restricted games solved
+ * pivots: pivots spent over every restricted solve
+ * evaluations: payoff oracle calls
+ '''
+
+
+class DoubleOracleSolution:
+
+	def __init__(self, rows, cols, p1_strategy, p2_strategy, lower, upper, iterations, pivots, evaluations):
+		self.rows = rows
+		self.cols = cols
+		self.p1_strategy = p1_strategy
+		self.p2_strategy = p2_strategy
+		self.lower = lower
+		self.upper = upper
+		self.gap = upper - lower
+		self.iterations = iterations
+		self.pivots = pivots
+		self.evaluations = evaluations
+
+	'''
+	* Midpoint of the value bounds, the value itself once gap is 0
+	'''
+
+	@property
+	def value(self):
+		return self.lower if self.gap == 0 else (self.lower + self.upper) / 2
+
+	'''
+	* Strategies played with positive probability
+	*
+	* return: ({row: probability}, {col: probability})
+	'''
+
+	def support(self):
+		return ({row: p for (row, p) in zip(self.rows, self.p1_strategy) if p > 0},
+				{col: q for (col, q) in zip(self.cols, self.p2_strategy) if q > 0})
+
+	def __repr__(self):
+		return "DoubleOracleSolution(value in [{}, {}], {} x {} restricted game, iterations={})".format(
+			simplex.format_value(self.lower), simplex.format_value(self.upper), len(self.rows), len(self.cols),
+			self.iterations)
+
+
+'''
+ * The restricted game: the chosen strategies and the payoffs between them
+ *
+ * The revised backend keeps one revised.SolverSession and grows it, so
+ * every restricted solve starts from the previous optimal basis; the
+ * other backends solve each restricted game from scratch.
+ *
+ * entries: payoff of every chosen row against every chosen column
+ * evaluations: payoff oracle calls so far
+ '''
+
+
+class RestrictedGame:
+
+	def __init__(self, oracle, rows, cols, backend, pivot_rule):
+		self.oracle = oracle
+		self.backend = backend
+		self.pivot_rule = pivot_rule
+		self.rows = []
+		self.cols = []
+		self.entries = []
+		self.evaluations = 0
+		self.session = None
+		self.add(rows, cols)
+
+	'''
+	* Adds the strategies not already in the game, evaluating only the new
+	* entries
+	*
+	* return: number of strategies added
+	'''
+
+	def add(self, rows, cols) -> int:
+		new_rows = [row for row in dict.fromkeys(rows) if row not in self.rows]
+		new_cols = [col for col in dict.fromkeys(cols) if col not in self.cols]
+		for col in new_cols:
+			self.cols.append(col)
+			for (row, line) in zip(self.rows, self.entries):
+				line.append(self.oracle.payoff(row, col))
+			self.evaluations += len(self.rows)
+		for row in new_rows:
+			self.rows.append(row)
+			self.entries.append([self.oracle.payoff(row, col) for col in self.cols])
+			self.evaluations += len(self.cols)
+		return len(new_rows) + len(new_cols)
+
+	'''
+	* Solves the current restricted game
+	*
+	* return: (player 1 strategy, player 2 strategy, value, pivots)
+	'''
+
+	def solve(self):
+		(m, n) = (len(self.rows), len(self.cols))
+		if self.backend != "revised":
+			solution = simplex.solve_game(self.entries, self.backend, None, self.pivot_rule)
+			return (solution.p1_strategy, solution.p2_strategy, solution.value, solution.pivots)
+		if self.session is None:
+			self.session = revised.SolverSession(self.entries, m, n)
+			(p1_strategy, p2_strategy, value) = self.session.solve()
+		else:
+			(p1_strategy, p2_strategy, value) = self.session.grow(self.entries)
+		return (p1_strategy, p2_strategy, value, self.session.last_pivots)
+
+	'''
+	* Expected payoff of row against the mix q over the chosen columns,
+	* evaluating only the columns in its support
+	'''
+
+	def row_payoff(self, row, q):
+		support = [(col, prob) for (col, prob) in zip(self.cols, q) if prob != 0]
+		self.evaluations += len(support)
+		return sum(prob * self.oracle.payoff(row, col) for (col, prob) in support)
+
+	def col_payoff(self, col, p):
+		support = [(row, prob) for (row, prob) in zip(self.rows, p) if prob != 0]
+		self.evaluations += len(support)
+		return sum(prob * self.oracle.payoff(row, col) for (row, prob) in support)
+
+
+'''
+ * Solves a two person, zero-sum game given by a GameOracle
+ *
+ * Every iteration solves the restricted game, then asks for both players'
+ * best responses: the best row's payoff against the restricted p2 strategy
+ * is an upper bound on the value and the best column's against the p1
+ * strategy a lower bound. The solve stops once the bounds are within
+ * epsilon, or once neither best response is new, which means the
+ * restricted optimum is optimal in the full game.
+ *
+ * oracle: GameOracle of the game
+ * rows: row strategies to start the restricted game with, at least one
+ * cols: column strategies to start with, at least one
+ * backend: one of simplex.BACKENDS; revised warm-starts every solve
+ * epsilon: allowed gap between the bounds, None for 0 on the exact
+ *          backends and simplex.EPSILON on the float ones
+ * max_iterations: limit on restricted solves
+ * pivot_rule: name from simplex.PIVOT_RULES, for the tableau backends
+ *
+ * return: DoubleOracleSolution
+ '''
+
+
+def solve_double_oracle(oracle, rows, cols, backend="exact", epsilon=None, max_iterations=MAX_ITERATIONS,
+						pivot_rule="dantzig") -> DoubleOracleSolution:
+	if backend not in simplex.BACKENDS:
+		raise ValueError("Unknown backend {}".format(backend))
+	rows = list(rows)
+	cols = list(cols)
+	if not rows or not cols:
+		raise ValueError("Need at least one starting row and one starting column")
+	if epsilon is None:
+		epsilon = 0 if backend in EXACT_BACKENDS else simplex.EPSILON
+
+	game = RestrictedGame(oracle, rows, cols, backend, pivot_rule)
+	pivots = 0
+	for iteration in range(1, max_iterations + 1):
+		(p1_strategy, p2_strategy, _, spent) = game.solve()
+		pivots += spent
+		best_row = oracle.best_row(list(game.cols), p2_strategy)
+		best_col = oracle.best_col(list(game.rows), p1_strategy)
+		upper = game.row_payoff(best_row, p2_strategy)
+		lower = game.col_payoff(best_col, p1_strategy)
+		if upper - lower <= epsilon or game.add([best_row], [best_col]) == 0:
+			break
+	return DoubleOracleSolution(list(game.rows), list(game.cols), p1_strategy, p2_strategy, lower, upper, iteration,
+								pivots, game.evaluations)
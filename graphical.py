@@ -0,0 +1,145 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+from fractions import Fraction
+from typing import Tuple
+
+import numpy
+
+'''
+ * Closed-form solver for games where one player has only two strategies
+ *
+ * With two rows, player 1 plays row 0 with probability p and every column
+ * j pays a line f_j(p) = a_1j + p * (a_0j - a_1j). Player 2 answers with
+ * the lowest line, so player 1 maximizes the lower envelope of the lines
+ * over p in [0, 1]; the envelope is concave and its maximum is one of its
+ * vertices. Games with two columns are the same problem for player 2 on
+ * the upper envelope of the row lines. Everything is computed in
+ * Fractions, so the answer is exact for any payoff.
+ '''
+
+'''
+ * Where two lines (intercept, slope, ...) cross, first slope larger
+ '''
+
+
+def crossing(first, second) -> Fraction:
+	return (second[0] - first[0]) / (first[1] - second[1])
+
+
+'''
+ * Lower envelope of lines over [0, 1]
+ *
+ * The lines are sorted by slope, largest first, and a stack keeps the ones
+ * still on the envelope (the convex hull trick), so this is O(n log n).
+ *
+ * lines: sequence of (intercept, slope) pairs, Fractions
+ *
+ * return: list of (start, end, index) pieces covering [0, 1] from left to
+ *         right, index being the line that is lowest on [start, end]
+ '''
+
+
+def lower_envelope(lines) -> list:
+	ordered = sorted(((line[0], line[1], index) for index, line in enumerate(lines)),
+						key=lambda line: (-line[1], line[0]))
+	hull = []
+	for line in ordered:
+		# of parallel lines only the lowest, which sorts first, matters
+		if hull and hull[-1][1] == line[1]:
+			continue
+		while len(hull) >= 2 and crossing(hull[-2], line) <= crossing(hull[-2], hull[-1]):
+			hull.pop()
+		hull.append(line)
+
+	pieces = []
+	start = Fraction(0)
+	for position, line in enumerate(hull):
+		end = Fraction(1)
+		if position + 1 < len(hull):
+			end = min(end, crossing(line, hull[position + 1]))
+		if end > start:
+			pieces.append((start, end, line[2]))
+			start = end
+		if start == 1:
+			break
+	return pieces
+
+
+'''
+ * The lines of the player with two strategies, in payoff units
+ *
+ * payoff: 2 x n or m x 2 payoff matrix
+ * m: number of rows
+ * n: number of columns
+ *
+ * return: (lines, upper) where lines holds (intercept, slope) of every
+ *         column as a function of player 1's probability of row 0 when
+ *         m == 2, otherwise of every row as a function of player 2's
+ *         probability of column 0; upper is True when the optimum is on
+ *         the upper envelope (m x 2)
+ '''
+
+
+def strategy_lines(payoff, m, n) -> Tuple[list, bool]:
+	values = [[Fraction(entry) for entry in row] for row in numpy.asarray(payoff).reshape(m, n).tolist()]
+	if m == 2:
+		return ([(values[1][col], values[0][col] - values[1][col]) for col in range(n)], False)
+	return ([(values[row][1], values[row][0] - values[row][1]) for row in range(m)], True)
+
+
+'''
+ * Maximizes the lower envelope of lines and finds a mix of lines that
+ * holds every p to at most that maximum
+ *
+ * return: (p, mix over lines, value)
+ '''
+
+
+def maximize_envelope(lines) -> Tuple[Fraction, list, Fraction]:
+	pieces = lower_envelope(lines)
+	vertices = [(start, index) for (start, _, index) in pieces] + [(pieces[-1][1], pieces[-1][2])]
+	(p, index) = max(vertices, key=lambda vertex: lines[vertex[1]][0] + vertex[0] * lines[vertex[1]][1])
+	value = lines[index][0] + p * lines[index][1]
+
+	active = [index for index, line in enumerate(lines) if line[0] + p * line[1] == value]
+	slopes = [lines[index][1] for index in active]
+	mix = [Fraction(0)] * len(lines)
+	flat = [index for index in active if lines[index][1] == 0]
+	if flat:
+		mix[flat[0]] = Fraction(1)
+	elif p == 0 or max(slopes) < 0:
+		# at the left end a falling line already stays below value
+		mix[active[slopes.index(min(slopes))]] = Fraction(1)
+	elif p == 1 or min(slopes) > 0:
+		mix[active[slopes.index(max(slopes))]] = Fraction(1)
+	else:
+		# a rising and a falling line, weighted so their mix is flat
+		rising = active[slopes.index(max(slopes))]
+		falling = active[slopes.index(min(slopes))]
+		(up, down) = (lines[rising][1], lines[falling][1])
+		mix[rising] = -down / (up - down)
+		mix[falling] = up / (up - down)
+	return (p, mix, value)
+
+
+'''
+ * Solves a game with two rows or two columns exactly
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns, m == 2 or n == 2
+ *
+ * return: (player 1 strategy, player 2 strategy, value), all Fractions
+ '''
+
+
+def solve_graphically(payoff, m, n) -> Tuple[list, list, Fraction]:
+	if m != 2 and n != 2:
+		raise ValueError("Graphical solution needs 2 rows or 2 columns, got {} x {}".format(m, n))
+	(lines, upper) = strategy_lines(payoff, m, n)
+	if not upper:
+		(p, p2_strategy, value) = maximize_envelope(lines)
+		return ([p, 1 - p], p2_strategy, value)
+
+	# player 2 minimizes the upper envelope, the lower one of the negated lines
+	(q, p1_strategy, value) = maximize_envelope([(-intercept, -slope) for (intercept, slope) in lines])
+	return (p1_strategy, [q, 1 - q], -value)
@@ -0,0 +1,132 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+import simplex
+
+'''
+ * Multi-threaded pivot updates for very large tableaus
+ *
+ * Once the pivot row is known, every other row of the tableau is updated
+ * independently of the rest. The rows are split into blocks and each block
+ * is updated by an in-place NumPy operation on a thread pool; NumPy drops
+ * the GIL inside those loops, so the blocks really run in parallel on the
+ * shared tableau without copying it, and the pivot waits once for all of
+ * them. Only float tableaus and exact tableaus still in int64 are done this
+ * way, Python objects (Fractions, big integers) hold the GIL and fall back
+ * to the serial update.
+ '''
+
+# Tableaus with fewer rows than this are updated serially, the work per
+# pivot is too small to pay for handing out blocks
+MIN_PARALLEL_ROWS = 1024
+
+# Rows per block; small enough that a block's temporary stays in cache
+BLOCK_ROWS = 256
+
+'''
+ * Pivot update that spreads the row updates over a thread pool
+ *
+ * Call it like an entry of simplex.PIVOT_UPDATES, for instance as the
+ * update of simplex.pivot_until_optimal. Close it, or use it in a with
+ * block, to stop the threads.
+ *
+ * The update is picked from the backend name and the tableau's dtype,
+ * never by isinstance: run as a script, simplex is loaded twice (as
+ * __main__ and as simplex) and its tableaus are not instances of this
+ * module's simplex classes.
+ *
+ * backend: one of simplex.TABLEAU_BACKENDS, that of the tableaus pivoted
+ * threads: worker threads, defaults to the number of CPUs
+ * block_rows: rows per block
+ '''
+
+
+class ParallelPivot:
+
+	def __init__(self, backend, threads=None, block_rows=BLOCK_ROWS):
+		if backend not in simplex.TABLEAU_BACKENDS:
+			raise ValueError("Unknown tableau backend {}".format(backend))
+		self.backend = backend
+		self.serial_update = simplex.PIVOT_UPDATES[backend]
+		self.threads = threads or os.cpu_count() or 1
+		self.block_rows = block_rows
+		self.pool = ThreadPoolExecutor(max_workers=self.threads)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def close(self):
+		self.pool.shutdown()
+
+	def __call__(self, tableau, pivot_row, pivot_col):
+		rows = tableau.m.shape[0]
+		if self.threads <= 1 or rows < MIN_PARALLEL_ROWS:
+			return self.serial_update(tableau, pivot_row, pivot_col)
+		if self.backend == "float":
+			return self.float_pivot(tableau, pivot_row, pivot_col)
+		if self.backend == "exact" and tableau.m.dtype != object:
+			return self.exact_pivot(tableau, pivot_row, pivot_col)
+		return self.serial_update(tableau, pivot_row, pivot_col)
+
+	'''
+	* Runs update(start, end) for every block of rows and waits for all
+	'''
+
+	def run_blocks(self, rows, update):
+		bounds = range(0, rows, self.block_rows)
+		for future in [self.pool.submit(update, start, min(start + self.block_rows, rows)) for start in bounds]:
+			future.result()
+
+	'''
+	* Same update as simplex.apply_float_pivot, one rank-1 update per block
+	'''
+
+	def float_pivot(self, tableau, pivot_row, pivot_col):
+		m = tableau.m
+		m[pivot_row] /= m[pivot_row, pivot_col]
+		factors = m[:, pivot_col].copy()
+		factors[pivot_row] = 0.0
+		# workers read this copy, so the block holding the pivot row can
+		# write it back unchanged while the others are still reading
+		line = m[pivot_row].copy()
+
+		def update(start, end):
+			block = m[start:end]
+			block -= numpy.multiply.outer(factors[start:end], line)
+
+		self.run_blocks(m.shape[0], update)
+		m[:, pivot_col] = 0.0
+		m[pivot_row, pivot_col] = 1.0
+		tableau.basis[pivot_row] = pivot_col
+		return tableau
+
+	'''
+	* Same fraction-free update as simplex.apply_exact_pivot, per block
+	'''
+
+	def exact_pivot(self, tableau, pivot_row, pivot_col):
+		m = tableau.m
+		pivot_value = m[pivot_row, pivot_col]
+		column = m[:, pivot_col].copy()
+		line = m[pivot_row].copy()
+		d = tableau.d
+
+		def update(start, end):
+			block = m[start:end]
+			block *= pivot_value
+			block -= numpy.multiply.outer(column[start:end], line)
+			block //= d
+
+		self.run_blocks(m.shape[0], update)
+		m[pivot_row] = line
+		tableau.d = int(pivot_value)
+		simplex.fit_exact_tableau(tableau)
+		tableau.basis[pivot_row] = pivot_col
+		return tableau
+
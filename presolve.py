@@ -0,0 +1,139 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+import numpy
+
+# Modes accepted by --presolve
+PRESOLVE_MODES = ("strict", "weak")
+
+'''
+ * Result of presolving a game
+ *
+ * payoff: reduced payoff matrix
+ * rows: original index of every kept row, in order
+ * cols: original index of every kept column, in order
+ * m: number of kept rows
+ * n: number of kept columns
+ * original_m: number of rows before presolve
+ * original_n: number of columns before presolve
+ '''
+
+
+class Presolved:
+
+	def __init__(self, payoff, rows, cols, original_m, original_n):
+		self.payoff = payoff
+		self.rows = rows
+		self.cols = cols
+		self.m = len(rows)
+		self.n = len(cols)
+		self.original_m = original_m
+		self.original_n = original_n
+
+	'''
+	* Maps strategies of the reduced game back to the original game;
+	* removed strategies get probability 0
+	*
+	* return: (player 1 strategy, player 2 strategy)
+	'''
+
+	def expand(self, p1_strategy, p2_strategy):
+		zero = p1_strategy[0] * 0
+		p1_full = [zero] * self.original_m
+		p2_full = [zero] * self.original_n
+		for index, row in enumerate(self.rows):
+			p1_full[row] = p1_strategy[index]
+		for index, col in enumerate(self.cols):
+			p2_full[col] = p2_strategy[index]
+		return (p1_full, p2_full)
+
+	'''
+	* Maps a basis of the reduced game (basis[row] is the variable basic in
+	* that row, x_j is j and s_i is n + i) to the original game; removed
+	* rows keep their slack basic and removed columns stay nonbasic
+	*
+	* return: basis of the original game
+	'''
+
+	def expand_basis(self, basis):
+		full = [self.original_n + row for row in range(self.original_m)]
+		for index, var in enumerate(basis):
+			if var < self.n:
+				full[self.rows[index]] = self.cols[var]
+			else:
+				full[self.rows[index]] = self.original_n + self.rows[var - self.n]
+		return full
+
+
+'''
+ * Picks the rows worth keeping for the player who maximizes over them
+ *
+ * Duplicate rows are merged into their first copy, then every row that is
+ * dominated by another remaining row is dropped. Rows are dropped one at a
+ * time so two rows can never eliminate each other.
+ *
+ * values: 2-D array, one candidate strategy per row
+ * lines: indices into values still in the game
+ * weak: also drop weakly dominated rows (>= everywhere, > somewhere)
+ *
+ * return: indices from lines that survive
+ '''
+
+
+def reduce_lines(values, lines, weak=False) -> list:
+	kept = []
+	seen = set()
+	for line in lines:
+		key = tuple(values[line])
+		if key not in seen:
+			seen.add(key)
+			kept.append(line)
+
+	for line in list(kept):
+		others = [other for other in kept if other != line]
+		if not others:
+			break
+		block = values[others]
+		if weak:
+			dominated = ((block >= values[line]).all(axis=1) & (block > values[line]).any(axis=1)).any()
+		else:
+			dominated = (block > values[line]).all(axis=1).any()
+		if dominated:
+			kept.remove(line)
+	return kept
+
+
+'''
+ * Repeatedly removes dominated and duplicate strategies of both players
+ *
+ * Removing strictly or weakly dominated strategies never changes the
+ * value of the game, and any optimal strategies of the reduced game are
+ * optimal in the original once expanded with Presolved.expand. Works on
+ * Fraction, integer and float payoffs alike.
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns
+ * weak: also remove weakly dominated strategies
+ *
+ * return: Presolved reduction of the game
+ '''
+
+
+def presolve(payoff, m, n, weak=False) -> Presolved:
+	values = numpy.asarray(payoff)
+	if values.dtype.kind == 'u':
+		# columns are compared negated, which unsigned types cannot hold
+		values = values.astype(numpy.int64)
+	rows = list(range(m))
+	cols = list(range(n))
+
+	while True:
+		block = values[numpy.ix_(rows, cols)]
+		kept_rows = reduce_lines(block, range(len(rows)), weak)
+		# player 2 minimizes, so their columns are compared negated
+		kept_cols = reduce_lines(-block[kept_rows].T, range(len(cols)), weak)
+		if len(kept_rows) == len(rows) and len(kept_cols) == len(cols):
+			break
+		rows = [rows[index] for index in kept_rows]
+		cols = [cols[index] for index in kept_cols]
+
+	return Presolved(values[numpy.ix_(rows, cols)], rows, cols, m, n)
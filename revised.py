@@ -0,0 +1,508 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+from typing import Tuple
+
+import numpy
+
+# Tolerance used when comparing against zero, same as simplex.EPSILON
+EPSILON = 1e-9
+
+# Number of eta updates kept before the basis is refactorized from scratch
+REFACTOR_INTERVAL = 50
+
+# Reduced costs are pushed at least this far below zero before dual pivots
+PERTURBATION = 1e-7
+
+# Dual pivots allowed per variable when repairing a warm-started basis
+DUAL_PIVOT_LIMIT = 4
+
+'''
+ * LU factorization of a square basis matrix with partial pivoting
+ *
+ * The triangular factors are inverted once when the basis is factorized,
+ * so every later solve is two BLAS matrix-vector products instead of a
+ * Python loop of substitutions.
+ *
+ * l_inv: inverse of the unit lower triangular factor L
+ * u_inv: inverse of the upper triangular factor U
+ * perm: row permutation, B[perm] = L @ U
+ '''
+
+
+class LUFactor:
+
+	def __init__(self, basis_matrix):
+		size = basis_matrix.shape[0]
+		lu = numpy.array(basis_matrix, dtype=numpy.float64, order='C')
+		perm = numpy.arange(size)
+		for k in range(size):
+			pivot = k + int(numpy.argmax(numpy.abs(lu[k:, k])))
+			if abs(lu[pivot, k]) < EPSILON:
+				raise ValueError("Basis matrix is singular")
+			if pivot != k:
+				lu[[k, pivot]] = lu[[pivot, k]]
+				perm[[k, pivot]] = perm[[pivot, k]]
+			lu[k+1:, k] /= lu[k, k]
+			lu[k+1:, k+1:] -= numpy.outer(lu[k+1:, k], lu[k, k+1:])
+		lower = numpy.tril(lu, -1) + numpy.eye(size)
+		upper = numpy.triu(lu)
+		self.l_inv = numpy.linalg.inv(lower)
+		self.u_inv = numpy.linalg.inv(upper)
+		self.perm = perm
+		self.size = size
+
+	'''
+	* Solves B x = b
+	'''
+
+	def solve(self, b):
+		return self.u_inv @ (self.l_inv @ numpy.asarray(b, dtype=numpy.float64)[self.perm])
+
+	'''
+	* Solves B^T y = c
+	'''
+
+	def solve_transpose(self, c):
+		z = (numpy.asarray(c, dtype=numpy.float64) @ self.u_inv) @ self.l_inv
+		y = numpy.empty_like(z)
+		y[self.perm] = z
+		return y
+
+
+'''
+ * Revised simplex solver for the game LP
+ *
+ * Solves max sum(x) s.t. (payoff + k) x + s = 1, x, s >= 0 like the
+ * tableau backends, but only keeps the boosted payoff, the basis and an
+ * LU factorization of the basis matrix. Each pivot appends one eta
+ * column (product form update) and the basis is refactorized every
+ * REFACTOR_INTERVAL pivots, so a pivot costs work in the size of the
+ * basis plus one pricing pass instead of rewriting the whole
+ * (m+1) x (n+m+1) tableau.
+ *
+ * a: boosted payoff matrix, kept unchanged
+ * k: booster added to the payoff
+ * basis: basis[row] is the variable basic in that row; variables below
+ *        n are player 2's columns, n + i is the slack of row i
+ * x_basic: current values of the basic variables
+ '''
+
+
+class RevisedSimplex:
+
+	def __init__(self, payoff, m, n):
+		values = numpy.asarray(payoff, dtype=numpy.float64).reshape(m, n)
+		low = values.min()
+		self.k = 1.0 - low if low < 1 else 0.0
+		self.a = values + self.k
+		self.m = m
+		self.n = n
+		# objective: player 2's columns cost 1, slacks 0
+		self.costs = numpy.concatenate((numpy.ones(n), numpy.zeros(m)))
+		self.basis = list(range(n, n + m))
+		self.x_basic = numpy.ones(m)
+		self.pivot_count = 0
+		self.refactor()
+
+	'''
+	* Column j of the constraint matrix [a | I]
+	'''
+
+	def column(self, var):
+		if var < self.n:
+			return self.a[:, var]
+		unit = numpy.zeros(self.m)
+		unit[var - self.n] = 1.0
+		return unit
+
+	'''
+	* Factorizes the current basis from scratch and clears the eta file
+	*
+	* Basic slacks are unit columns, so only the kernel formed by the basic
+	* payoff columns and the rows whose slack is nonbasic is LU factorized.
+	* Its size is the number of basic payoff columns, not m.
+	'''
+
+	def refactor(self):
+		self.structural = numpy.array([pos for pos, var in enumerate(self.basis) if var < self.n], dtype=int)
+		self.slack_positions = numpy.array([pos for pos, var in enumerate(self.basis) if var >= self.n], dtype=int)
+		self.slack_rows = numpy.array([self.basis[pos] - self.n for pos in self.slack_positions], dtype=int)
+		self.kernel_rows = numpy.setdiff1d(numpy.arange(self.m), self.slack_rows)
+
+		columns = numpy.array([self.basis[pos] for pos in self.structural], dtype=int)
+		self.coupling = self.a[numpy.ix_(self.slack_rows, columns)]
+		if len(columns) > 0:
+			self.factor = LUFactor(self.a[numpy.ix_(self.kernel_rows, columns)])
+		else:
+			self.factor = None
+		self.etas = []
+		self.x_basic = self.ftran(numpy.ones(self.m))
+
+	'''
+	* Solves B0 w = b for the factorized basis B0
+	'''
+
+	def base_solve(self, b):
+		w = numpy.zeros(self.m)
+		if self.factor is None:
+			w[self.slack_positions] = b[self.slack_rows]
+			return w
+		kernel = self.factor.solve(b[self.kernel_rows])
+		w[self.structural] = kernel
+		w[self.slack_positions] = b[self.slack_rows] - self.coupling @ kernel
+		return w
+
+	'''
+	* Solves B0^T y = c for the factorized basis B0
+	'''
+
+	def base_solve_transpose(self, c):
+		y = numpy.zeros(self.m)
+		y[self.slack_rows] = c[self.slack_positions]
+		if self.factor is not None:
+			rhs = c[self.structural] - y[self.slack_rows] @ self.coupling
+			y[self.kernel_rows] = self.factor.solve_transpose(rhs)
+		return y
+
+	'''
+	* Solves B w = b through the LU factor and the eta file
+	'''
+
+	def ftran(self, b):
+		w = self.base_solve(numpy.asarray(b, dtype=numpy.float64))
+		for (row, eta) in self.etas:
+			pivot = w[row]
+			w += eta * pivot
+			w[row] = eta[row] * pivot
+		return w
+
+	'''
+	* Solves B^T y = c through the eta file and the LU factor
+	'''
+
+	def btran(self, c):
+		u = numpy.array(c, dtype=numpy.float64)
+		for (row, eta) in reversed(self.etas):
+			# u^T E only changes the entry in the eta's row
+			u[row] = u @ eta
+		return self.base_solve_transpose(u)
+
+	'''
+	* Dual values of the constraints, which are player 1's weights
+	'''
+
+	def duals(self):
+		return self.btran(self.costs[self.basis])
+
+	'''
+	* Reduced cost of every variable, zero for basic ones
+	'''
+
+	def reduced_costs(self):
+		y = self.duals()
+		reduced = self.costs - numpy.concatenate((y @ self.a, y))
+		reduced[self.basis] = 0.0
+		return reduced
+
+	'''
+	* Chooses the entering variable by the most positive reduced cost
+	*
+	* return: entering variable, or -1 when the basis is optimal
+	'''
+
+	def price(self):
+		reduced = self.reduced_costs()
+		entering = int(numpy.argmax(reduced))
+		if reduced[entering] <= EPSILON:
+			return -1
+		return entering
+
+	def finished(self):
+		return self.price() < 0
+
+	'''
+	* Prices and runs the ratio test for the next pivot without applying it
+	*
+	* return: (pivot_row, entering variable, B^-1 times the entering column),
+	*         or (-1, -1, None) if optimal
+	'''
+
+	def select_pivot(self):
+		entering = self.price()
+		if entering < 0:
+			return (-1, -1, None)
+
+		w = self.ftran(self.column(entering))
+		candidates = w > EPSILON
+		if not candidates.any():
+			raise ValueError("Problem is unbounded in column {}".format(entering))
+		ratios = numpy.full(self.m, numpy.inf)
+		numpy.divide(self.x_basic, w, out=ratios, where=candidates)
+		pivot_row = int(numpy.argmin(ratios))
+		return (pivot_row, entering, w)
+
+	'''
+	* Performs one revised simplex pivot
+	*
+	* return: (pivot_row, entering variable), or (-1, -1) if optimal
+	'''
+
+	def pivot(self) -> Tuple[int, int]:
+		(pivot_row, entering, w) = self.select_pivot()
+		if pivot_row < 0:
+			return (-1, -1)
+
+		self.replace(pivot_row, entering, w)
+		return (pivot_row, entering)
+
+	'''
+	* Current objective, the sum of player 2's unnormalized variables
+	'''
+
+	def objective(self) -> float:
+		return float(sum(self.x_basic[row] for row, var in enumerate(self.basis) if var < self.n))
+
+	'''
+	* Performs one dual simplex pivot, for a dual feasible basis whose
+	* basic values have gone negative
+	*
+	* return: (pivot_row, entering variable), or (-1, -1) if primal feasible
+	'''
+
+	def dual_pivot(self) -> Tuple[int, int]:
+		pivot_row = int(numpy.argmin(self.x_basic))
+		if self.x_basic[pivot_row] >= -EPSILON:
+			return (-1, -1)
+
+		reduced = self.reduced_costs()
+		unit = numpy.zeros(self.m)
+		unit[pivot_row] = 1.0
+		row = self.btran(unit)
+		alpha = numpy.concatenate((row @ self.a, row))
+		alpha[self.basis] = 0.0
+
+		candidates = alpha < -EPSILON
+		if not candidates.any():
+			raise ValueError("Problem is infeasible in row {}".format(pivot_row))
+		ratios = numpy.full(alpha.shape, numpy.inf)
+		numpy.divide(reduced, alpha, out=ratios, where=candidates)
+		entering = int(numpy.argmin(ratios))
+
+		self.replace(pivot_row, entering, self.ftran(self.column(entering)))
+		return (pivot_row, entering)
+
+	'''
+	* Swaps the entering variable into pivot_row and records the eta column
+	*
+	* w: B^-1 times the entering column
+	'''
+
+	def replace(self, pivot_row, entering, w):
+		step = self.x_basic[pivot_row] / w[pivot_row]
+		self.x_basic -= step * w
+		self.x_basic[pivot_row] = step
+
+		eta = -w / w[pivot_row]
+		eta[pivot_row] = 1.0 / w[pivot_row]
+		self.etas.append((pivot_row, eta))
+		self.basis[pivot_row] = entering
+		self.pivot_count += 1
+
+		if len(self.etas) >= REFACTOR_INTERVAL:
+			self.refactor()
+
+	'''
+	* Replaces the payoff and repairs the current basis for it
+	*
+	* The booster only ever grows, so the old basis stays meaningful. If the
+	* basis is still primal feasible the primal pivots finish the job.
+	* Otherwise the costs of nonbasic variables are lowered just enough to
+	* make the basis dual feasible, dual pivots restore primal feasibility,
+	* and the real costs come back for the primal pivots. A basis that
+	* became singular, or that the dual pivots fail to repair within
+	* DUAL_PIVOT_LIMIT * (m + n) pivots, is dropped for the all-slack
+	* basis, which is always feasible.
+	*
+	* payoff: new m x n payoff matrix
+	'''
+
+	def set_payoff(self, payoff):
+		values = numpy.asarray(payoff, dtype=numpy.float64).reshape(self.m, self.n)
+		low = values.min()
+		if low + self.k < 1:
+			self.k = 1.0 - low
+		self.a = values + self.k
+
+		try:
+			self.refactor()
+		except ValueError:
+			self.reset()
+			return
+		if (self.x_basic >= -EPSILON).all():
+			return
+
+		# every nonbasic reduced cost is pushed to a small distinct negative
+		# value; exact zeros would make the dual pivots stall on ties
+		costs = self.costs
+		reduced = self.reduced_costs()
+		target = numpy.minimum(reduced, -PERTURBATION * (1.0 + numpy.arange(len(reduced)) / len(reduced)))
+		target[self.basis] = 0.0
+		self.costs = costs - (reduced - target)
+		try:
+			for _ in range(DUAL_PIVOT_LIMIT * (self.m + self.n)):
+				if self.dual_pivot()[0] < 0:
+					break
+			else:
+				self.costs = costs
+				self.reset()
+		finally:
+			self.costs = costs
+
+	'''
+	* Replaces the payoff with a larger one that keeps the old one as its
+	* top left block, and repairs the current basis for it
+	*
+	* Old payoff columns keep their variables and the old slacks move up
+	* past the new columns. A new column starts nonbasic, which leaves the
+	* basis feasible; a new row starts with its slack basic, which the
+	* current strategy may violate, and set_payoff repairs that.
+	*
+	* payoff: new m' x n' payoff matrix, m' >= m and n' >= n
+	'''
+
+	def resize(self, payoff):
+		values = numpy.asarray(payoff, dtype=numpy.float64)
+		(m, n) = values.shape
+		if m < self.m or n < self.n:
+			raise ValueError("Payoff can only grow, from {} x {} to {} x {}".format(self.m, self.n, m, n))
+		self.basis = [var if var < self.n else var - self.n + n for var in self.basis]
+		self.basis += list(range(n + self.m, n + m))
+		self.m = m
+		self.n = n
+		self.costs = numpy.concatenate((numpy.ones(n), numpy.zeros(m)))
+		self.set_payoff(values)
+
+	'''
+	* Returns to the all-slack starting basis
+	'''
+
+	def reset(self):
+		self.basis = list(range(self.n, self.n + self.m))
+		self.refactor()
+
+	'''
+	* Reads the optimal strategies and game value off the final basis
+	*
+	* return: (player 1 strategy, player 2 strategy, value)
+	'''
+
+	def get_strategies(self) -> Tuple[list, list, float]:
+		v = sum(self.x_basic[row] for row, var in enumerate(self.basis) if var < self.n)
+		value = (1 / v) - self.k
+
+		y = self.duals()
+		p1_strategy = [float(entry / v) for entry in y]
+		p2_strategy = [0.0] * self.n
+		for row, var in enumerate(self.basis):
+			if var < self.n:
+				p2_strategy[var] = float(self.x_basic[row] / v)
+		return (p1_strategy, p2_strategy, float(value))
+
+
+'''
+ * Solves a game with the revised simplex method
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns
+ *
+ * return: (player 1 strategy, player 2 strategy, value)
+ '''
+
+
+def solve_revised(payoff, m, n) -> Tuple[list, list, float]:
+	solver = RevisedSimplex(payoff, m, n)
+	while solver.pivot()[0] >= 0:
+		pass
+	return solver.get_strategies()
+
+
+'''
+ * Solver session that re-solves a game after small payoff changes
+ *
+ * The revised simplex basis of the last solve is kept, so after an update
+ * the solve restarts from it through RevisedSimplex.set_payoff instead of
+ * from the slack basis. A few changed entries usually cost a handful of
+ * pivots.
+ *
+ * payoff: current payoff matrix, owned by the session
+ * solver: RevisedSimplex holding the basis
+ * last_pivots: pivots spent by the most recent solve
+ '''
+
+
+class SolverSession:
+
+	def __init__(self, payoff, m, n):
+		self.payoff = numpy.array(payoff, dtype=numpy.float64).reshape(m, n)
+		self.m = m
+		self.n = n
+		self.solver = RevisedSimplex(self.payoff, m, n)
+		self.last_pivots = 0
+
+	'''
+	* Pivots to optimality from the current basis
+	*
+	* return: (player 1 strategy, player 2 strategy, value)
+	'''
+
+	def solve(self) -> Tuple[list, list, float]:
+		start = self.solver.pivot_count
+		while self.solver.pivot()[0] >= 0:
+			pass
+		self.last_pivots = self.solver.pivot_count - start
+		return self.solver.get_strategies()
+
+	def update_entry(self, row, col, value) -> Tuple[list, list, float]:
+		self.payoff[row, col] = value
+		return self.resolve()
+
+	def update_row(self, row, values) -> Tuple[list, list, float]:
+		self.payoff[row, :] = values
+		return self.resolve()
+
+	def update_column(self, col, values) -> Tuple[list, list, float]:
+		self.payoff[:, col] = values
+		return self.resolve()
+
+	'''
+	* Re-solves with rows and columns added to the bottom and right of the
+	* payoff, keeping the basis through RevisedSimplex.resize
+	*
+	* payoff: new payoff matrix, the current one as its top left block
+	*
+	* return: (player 1 strategy, player 2 strategy, value)
+	'''
+
+	def grow(self, payoff) -> Tuple[list, list, float]:
+		self.payoff = numpy.array(payoff, dtype=numpy.float64)
+		(self.m, self.n) = self.payoff.shape
+		start = self.solver.pivot_count
+		self.solver.resize(self.payoff)
+		repair = self.solver.pivot_count - start
+		result = self.solve()
+		self.last_pivots += repair
+		return result
+
+	'''
+	* Re-solves after self.payoff was changed in place
+	*
+	* return: (player 1 strategy, player 2 strategy, value)
+	'''
+
+	def resolve(self) -> Tuple[list, list, float]:
+		start = self.solver.pivot_count
+		self.solver.set_payoff(self.payoff)
+		repair = self.solver.pivot_count - start
+		result = self.solve()
+		self.last_pivots += repair
+		return result
@@ -0,0 +1,487 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+import asyncio
+import collections
+import json
+import math
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+import simplex
+
+'''
+ * Long-running local solver service
+ *
+ * Clients connect over a Unix socket or TCP and send one JSON object per
+ * line; every request line gets one response line, carrying the request's
+ * id, as soon as its game is solved, so a client may pipeline many
+ * requests on one connection. Requests are gathered into micro-batches
+ * (up to batch_size games, or whatever arrived within batch_delay of the
+ * first) and each batch is solved in one call on a process pool whose
+ * workers imported the solver when they started.
+ *
+ * Request:  {"id": 1, "payoff": [[1, -1], [-1, 1]], "backend": "exact",
+ *            "presolve": null, "pivot_rule": "dantzig"}
+ *           {"id": 2, "op": "stats"}
+ * Response: {"id": 1, "p1": [...], "p2": [...], "value": ..., "pivots": 0,
+ *            "basis": null, "backend": "exact"}
+ *           {"id": 1, "error": "message"}
+ *
+ * Exact numbers travel as strings ("3/4"), floats as JSON numbers.
+ '''
+
+# Default number of games solved per batch
+BATCH_SIZE = 32
+
+# Default seconds a batch waits for more games after its first one
+BATCH_DELAY = 0.002
+
+# Default number of requests queued before readers stop reading
+MAX_PENDING = 1024
+
+# Default seconds from arrival to answer before a request times out
+TIMEOUT = 30.0
+
+# Latencies kept for the percentiles in the stats
+LATENCY_WINDOW = 10000
+
+'''
+ * JSON form of a number: exact values as "n/d" strings, floats as floats
+ '''
+
+
+def encode_number(value):
+	if hasattr(value, "item"):
+		# NumPy scalars, whose fixed-width integers Fraction mishandles
+		value = value.item()
+	if isinstance(value, float):
+		return value
+	return simplex.format_frac(Fraction(value))
+
+
+'''
+ * Number from its JSON form, strings becoming Fractions
+ *
+ * JSON has no infinities, but Python's decoder turns an overflowing
+ * literal such as 1e400 into one, which no backend can solve with.
+ '''
+
+
+def decode_number(value):
+	if isinstance(value, str):
+		return Fraction(value)
+	if isinstance(value, float) and not math.isfinite(value):
+		raise ValueError("Payoff entries must be finite")
+	return value
+
+
+'''
+ * Solves one decoded request in a worker process
+ *
+ * Every failure becomes an error response for this request alone, so a
+ * bad game never fails the rest of its batch.
+ *
+ * return: response fields without the id
+ '''
+
+
+def solve_request(request) -> dict:
+	try:
+		payoff = [[decode_number(entry) for entry in row] for row in request["payoff"]]
+		solution = simplex.solve_game(payoff, request.get("backend", "exact"), request.get("presolve"),
+										request.get("pivot_rule", "dantzig"))
+	except Exception as error:
+		return {"error": "{}: {}".format(type(error).__name__, error)}
+	return {
+		"p1": [encode_number(p) for p in solution.p1_strategy],
+		"p2": [encode_number(q) for q in solution.p2_strategy],
+		"value": encode_number(solution.value),
+		"pivots": solution.pivots,
+		"basis": solution.basis,
+		"backend": solution.backend,
+	}
+
+
+'''
+ * Solves a whole batch in a worker process, one pool call per batch
+ '''
+
+
+def solve_batch(requests) -> list:
+	return [solve_request(request) for request in requests]
+
+
+'''
+ * Worker initializer: imports the solver and runs every backend once, so
+ * the first real request pays no import or warm-up cost
+ '''
+
+
+def warm_worker():
+	for backend in simplex.BACKENDS:
+		simplex.solve_game([[3, -1, 0], [-2, 2, 1], [0, 1, -1]], backend)
+
+
+'''
+ * Latency and throughput counters of a server
+ *
+ * received: requests read
+ * completed: requests answered with a solution
+ * failed: requests answered with a solver or format error
+ * timed_out: requests that passed their timeout
+ * batches: batches sent to the pool
+ * batched: games over every batch, batched / batches is the mean size
+ * latencies: seconds from arrival to answer of recent requests
+ '''
+
+
+class ServerStats:
+
+	def __init__(self):
+		self.started = time.monotonic()
+		self.received = 0
+		self.completed = 0
+		self.failed = 0
+		self.timed_out = 0
+		self.batches = 0
+		self.batched = 0
+		self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+
+	'''
+	* Counters as a JSON-ready dict, with throughput in answered requests
+	* per second since the start and latency percentiles in milliseconds
+	'''
+
+	def snapshot(self, pending, in_flight) -> dict:
+		uptime = time.monotonic() - self.started
+		ordered = sorted(self.latencies)
+
+		def percentile(fraction):
+			if not ordered:
+				return None
+			return 1000 * ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+		return {
+			"uptime": uptime,
+			"received": self.received,
+			"completed": self.completed,
+			"failed": self.failed,
+			"timed_out": self.timed_out,
+			"pending": pending,
+			"in_flight": in_flight,
+			"batches": self.batches,
+			"mean_batch": self.batched / self.batches if self.batches else 0.0,
+			"throughput": self.completed / uptime if uptime > 0 else 0.0,
+			"latency_ms": {"p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99)},
+		}
+
+
+'''
+ * Asyncio solver server
+ *
+ * Readers put requests on a bounded queue, and a full queue makes them
+ * wait, which stops reading from the socket and pushes back on clients.
+ * One batcher task drains the queue into batches and at most processes
+ * batches are in the pool at once, so queued requests wait in the queue
+ * rather than in the pool. A request not answered within timeout of its
+ * arrival gets a timeout error; its game may still finish in the pool.
+ *
+ * path: Unix socket path, or None to listen on host:port
+ * processes: pool workers, defaults to the number of CPUs
+ * batch_size: most games per batch
+ * batch_delay: seconds a batch waits for more games
+ * max_pending: bound of the request queue
+ * timeout: seconds before a request times out
+ '''
+
+
+class SolverServer:
+
+	def __init__(self, path=None, host="127.0.0.1", port=0, processes=None, batch_size=BATCH_SIZE,
+					batch_delay=BATCH_DELAY, max_pending=MAX_PENDING, timeout=TIMEOUT):
+		self.path = path
+		self.host = host
+		self.port = port
+		self.processes = processes or os.cpu_count() or 1
+		self.batch_size = batch_size
+		self.batch_delay = batch_delay
+		self.max_pending = max_pending
+		self.timeout = timeout
+		self.stats = ServerStats()
+		self.pool = None
+		self.server = None
+		self.queue = None
+		self.slots = None
+		self.in_flight = 0
+		self.batcher = None
+		self.batch_tasks = set()
+
+	'''
+	* Starts the pool, the batcher and the listening socket; with port 0
+	* the port picked by the system is stored in self.port
+	'''
+
+	async def start(self):
+		self.pool = ProcessPoolExecutor(self.processes, initializer=warm_worker)
+		# start every worker now rather than on the first batch
+		loop = asyncio.get_running_loop()
+		await asyncio.gather(*[loop.run_in_executor(self.pool, solve_batch, []) for _ in range(self.processes)])
+		self.queue = asyncio.Queue(self.max_pending)
+		self.slots = asyncio.Semaphore(self.processes)
+		self.batcher = asyncio.create_task(self.run_batches())
+		if self.path is not None:
+			self.server = await asyncio.start_unix_server(self.handle, path=self.path)
+		else:
+			self.server = await asyncio.start_server(self.handle, self.host, self.port)
+			self.port = self.server.sockets[0].getsockname()[1]
+
+	'''
+	* Serves until cancelled or sent SIGTERM, then cleans up
+	'''
+
+	async def serve_forever(self):
+		await self.start()
+		try:
+			asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self.server.close)
+		except (NotImplementedError, RuntimeError):
+			# no signal handlers on Windows, nor outside the main thread
+			pass
+		try:
+			await self.server.serve_forever()
+		finally:
+			await self.close()
+
+	async def close(self):
+		if self.server is not None:
+			self.server.close()
+			await self.server.wait_closed()
+		if self.batcher is not None:
+			self.batcher.cancel()
+		if self.pool is not None:
+			self.pool.shutdown(cancel_futures=True)
+		if self.path is not None and os.path.exists(self.path):
+			os.unlink(self.path)
+
+	'''
+	* Serves one connection, answering its requests as they complete
+	'''
+
+	async def handle(self, reader, writer):
+		tasks = set()
+		try:
+			while True:
+				line = await reader.readline()
+				if not line:
+					break
+				if not line.strip():
+					continue
+				self.stats.received += 1
+				arrived = time.monotonic()
+				try:
+					request = json.loads(line)
+					assert isinstance(request, dict)
+				except (ValueError, AssertionError):
+					self.stats.failed += 1
+					await self.respond(writer, {"id": None, "error": "Request is not a JSON object"})
+					continue
+				if request.get("op") == "stats":
+					await self.respond(writer, {"id": request.get("id"), "stats": self.snapshot()})
+					continue
+
+				future = asyncio.get_running_loop().create_future()
+				try:
+					await asyncio.wait_for(self.queue.put((request, future)), self.timeout)
+				except asyncio.TimeoutError:
+					self.stats.timed_out += 1
+					await self.respond(writer, {"id": request.get("id"), "error": "Timed out waiting for the queue"})
+					continue
+				task = asyncio.create_task(self.answer(writer, request, future, arrived))
+				tasks.add(task)
+				task.add_done_callback(tasks.discard)
+			if tasks:
+				await asyncio.gather(*tasks)
+		except ConnectionError:
+			pass
+		finally:
+			for task in tasks:
+				task.cancel()
+			writer.close()
+
+	async def answer(self, writer, request, future, arrived):
+		remaining = self.timeout - (time.monotonic() - arrived)
+		try:
+			result = await asyncio.wait_for(asyncio.shield(future), max(remaining, 0))
+		except asyncio.TimeoutError:
+			self.stats.timed_out += 1
+			result = {"error": "Timed out after {} seconds".format(self.timeout)}
+		else:
+			if "error" in result:
+				self.stats.failed += 1
+			else:
+				self.stats.completed += 1
+			self.stats.latencies.append(time.monotonic() - arrived)
+		await self.respond(writer, dict(result, id=request.get("id")))
+
+	async def respond(self, writer, response):
+		writer.write((json.dumps(response) + "\n").encode())
+		await writer.drain()
+
+	def snapshot(self) -> dict:
+		return self.stats.snapshot(self.queue.qsize(), self.in_flight)
+
+	'''
+	* Gathers queued requests into batches and hands each batch to the
+	* pool once a slot is free
+	'''
+
+	async def run_batches(self):
+		loop = asyncio.get_running_loop()
+		while True:
+			batch = [await self.queue.get()]
+			deadline = loop.time() + self.batch_delay
+			while len(batch) < self.batch_size:
+				remaining = deadline - loop.time()
+				if remaining <= 0 and self.queue.empty():
+					break
+				try:
+					batch.append(self.queue.get_nowait() if remaining <= 0 else
+									await asyncio.wait_for(self.queue.get(), remaining))
+				except asyncio.TimeoutError:
+					break
+			await self.slots.acquire()
+			# the loop only keeps weak references to tasks
+			task = asyncio.create_task(self.run_batch(batch))
+			self.batch_tasks.add(task)
+			task.add_done_callback(self.batch_tasks.discard)
+
+	async def run_batch(self, batch):
+		self.stats.batches += 1
+		self.stats.batched += len(batch)
+		self.in_flight += len(batch)
+		try:
+			requests = [request for (request, _) in batch]
+			try:
+				results = await asyncio.get_running_loop().run_in_executor(self.pool, solve_batch, requests)
+			except Exception as error:
+				results = [{"error": "Worker failed: {}".format(error)}] * len(batch)
+			for ((_, future), result) in zip(batch, results):
+				if not future.done():
+					future.set_result(result)
+		finally:
+			self.in_flight -= len(batch)
+			self.slots.release()
+
+
+'''
+ * Class for storing the result of parsing the server's command line
+ *
+ * success: parsing of command line arguments was successful
+ * path: Unix socket path, None for TCP
+ * host: TCP host
+ * port: TCP port
+ * processes: pool workers, None for the number of CPUs
+ * batch_size: most games per batch
+ * batch_delay: seconds a batch waits for more games
+ * max_pending: bound of the request queue
+ * timeout: seconds before a request times out
+ '''
+
+
+class ServerArgs:
+
+	def __init__(self):
+		self.path = None
+		self.host = "127.0.0.1"
+		self.port = 8765
+		self.processes = None
+		self.batch_size = BATCH_SIZE
+		self.batch_delay = BATCH_DELAY
+		self.max_pending = MAX_PENDING
+		self.timeout = TIMEOUT
+		self.success = False
+
+
+'''
+ * Print the usage statement for the server.
+ '''
+
+
+def print_usage():
+	print("usage: server [options]")
+	print("options:")
+	print("\t--socket=PATH: listen on a Unix socket instead of TCP")
+	print("\t--host=HOST: TCP host, default 127.0.0.1")
+	print("\t--port=N: TCP port, default 8765")
+	print("\t--processes=N: solver processes, default the number of CPUs")
+	print("\t--batch=N: most games per batch, default {}".format(BATCH_SIZE))
+	print("\t--delay=MS: milliseconds a batch waits for more games, default {:g}".format(1000 * BATCH_DELAY))
+	print("\t--pending=N: queued requests before reading pauses, default {}".format(MAX_PENDING))
+	print("\t--timeout=S: seconds before a request times out, default {:g}".format(TIMEOUT))
+
+
+'''
+ * Parses the server's command line arguments.
+ *
+ * argc: number of command line arguments
+ * argv: array of string tokens
+ *
+ * return: server arguments structure
+ '''
+
+
+def parse_args(argc: int, argv: list) -> ServerArgs:
+	result = ServerArgs()
+	try:
+		for token in argv[1:argc]:
+			name, _, value = token.lstrip("-").partition("=")
+			assert token.startswith("--") and value
+			if name == "socket":
+				result.path = value
+			elif name == "host":
+				result.host = value
+			elif name == "port":
+				result.port = int(value)
+			elif name == "processes":
+				result.processes = int(value)
+				assert result.processes > 0
+			elif name == "batch":
+				result.batch_size = int(value)
+				assert result.batch_size > 0
+			elif name == "delay":
+				result.batch_delay = float(value) / 1000
+				assert result.batch_delay >= 0
+			elif name == "pending":
+				result.max_pending = int(value)
+				assert result.max_pending > 0
+			elif name == "timeout":
+				result.timeout = float(value)
+				assert result.timeout > 0
+			else:
+				return result
+	except (ValueError, AssertionError):
+		return result
+
+	result.success = True
+	return result
+
+
+def main():
+	args = parse_args(len(sys.argv), sys.argv)
+	if not args.success:
+		print_usage()
+		return -1
+
+	server = SolverServer(args.path, args.host, args.port, args.processes, args.batch_size, args.batch_delay,
+							args.max_pending, args.timeout)
+	try:
+		asyncio.run(server.serve_forever())
+	except (KeyboardInterrupt, asyncio.CancelledError):
+		pass
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -1,19 +1,55 @@
 # Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
-from ctypes import Union
 import sys
 from typing import Tuple  # Command line argument handling
 import numpy  # Python matrix ops
 from fractions import Fraction
+import math
 import os  # Could be useful for saving output to file if desired
+import time  # Per-pivot timing for observers
+import contextlib  # Lifetime of the parallel pivot thread pool
 
 import numpy as np
 
+import approximate  # Iterative solvers for very large games
+import graphical  # Closed-form 2 x n and m x 2 games
+import presolve  # Dominance and duplicate elimination
+import revised  # Revised simplex engine
+import sparse  # Sparse payoffs and sparse tableau engine
+import symmetry  # Skew-symmetric and symmetry class reductions
+
+# Tableau arithmetic backends, see get_init_tableau
+TABLEAU_BACKENDS = ("fraction", "float", "exact")
+
+# Names accepted by --backend; revised runs the revised simplex engine,
+# sparse the sparse tableau engine of sparse.py and hybrid pivots in
+# floats then certifies an exact answer (certify.py)
+BACKENDS = TABLEAU_BACKENDS + ("revised", "sparse", "hybrid")
+
+# Tolerance used by the float backend when comparing against zero
+EPSILON = 1e-9
+
+# Exact tableaus stay in int64 while every entry is below this bound, so a
+# Bareiss update p * row - col * pivot_row can never overflow
+EXACT_INT64_BOUND = math.isqrt(2 ** 62)
+
 '''
  * Class for storing the result of parsing command line arguments
  *
  * success: parsing of command line arguments was successful
  * m: number of rows
  * n: number of columns
+ * backend: solver backend, one of BACKENDS
+ * stream: multi-game input to solve, "-" for stdin, None for one game
+ * payoff_file: .npy or raw binary payoff file, None to prompt for it
+ * dtype: element type of a raw binary payoff file
+ * presolve_mode: one of presolve.PRESOLVE_MODES, None to skip presolve
+ * quiet: print only the solution, never a tableau or pivot
+ * profile: print where the solve loop spent its time
+ * pivot_rule: tableau pivot rule, one of PIVOT_RULES
+ * cache: solution store directory for --stream, "" to cache in memory
+ *        only, None to solve every game
+ * approximate: duality gap for approximate.solve_approximate, None to
+ *              solve exactly
  '''
 
 
@@ -22,6 +58,17 @@ class ArgResult:
 	def __init__(self):
 		self.m = -1
 		self.n = -1
+		self.backend = "fraction"
+		self.stream = None
+		self.payoff_file = None
+		self.dtype = "float64"
+		self.presolve_mode = None
+		self.quiet = False
+		self.profile = False
+		self.pivot_rule = "dantzig"
+		self.cache = None
+		self.approximate = None
+		self.threads = None
 		self.success = False
 
 
@@ -73,6 +120,20 @@ def format_frac(frac):
 	else:
 		return "{}/{}".format(frac.numerator, frac.denominator)
 
+
+'''
+ * Formats a strategy entry or game value from any backend
+ *
+ * value: Fraction, or float from the float backend
+ '''
+
+
+def format_value(value):
+	if isinstance(value, (float, np.floating)):
+		return "{:.6g}".format(0.0 if abs(value) < EPSILON else value)
+	return format_frac(Fraction(value))
+
+
 '''
  * Struct for storing a tableau
  *
@@ -81,10 +142,15 @@ def format_frac(frac):
  * x_size: length of X
  * rows: number of rows in m
  * cols: number of columns in m
+ *
+ * Tableaus use __slots__, so a batch worker holding many of them pays
+ * for the cells and nothing else.
  '''
 
 
 class Tableau:
+	__slots__ = ("s_size", "x_size", "rows", "cols", "k", "m", "basis")
+
 	# this is equivalent to create_tableau in Aidan's simplex.c
 	def __init__(self, s_size, x_size):
 		self.s_size = s_size
@@ -92,12 +158,11 @@ class Tableau:
 		self.rows = s_size + 1
 		self.cols = x_size + s_size + 1
 		self.k = 0
-		# print( self.rows, self.cols, "in tableau constructor")
-		# numpy makes 2 for loops in C into a line of code - SF 10/13
-		self.m = numpy.zeros((self.rows, self.cols)).astype('object')  # Generate m here
-		for row, _ in enumerate(self.m):
-			for col, _ in enumerate(self.m[row]):
-				self.m[row][col] = Fraction(0)
+		# Fractions are immutable, so every cell can start out as the same
+		# zero and the array is built in one allocation
+		self.m = numpy.full((self.rows, self.cols), Fraction(0), dtype=object)
+		# basis[row] is the variable currently basic in that row, slacks first
+		self.basis = list(range(x_size, x_size + s_size))
 
 	# equivalent to print_tableau in Aidan's simplex.c
 	def __str__(self):
@@ -131,6 +196,83 @@ class Tableau:
 		return
 
 
+'''
+ * Tableau for the float backend
+ *
+ * Same layout as Tableau, but m is a C-contiguous float64 array so a
+ * pivot is one in-place rank-1 update instead of a loop over Fractions.
+ '''
+
+
+class FloatTableau(Tableau):
+	__slots__ = ()
+
+	def __init__(self, s_size, x_size):
+		self.s_size = s_size
+		self.x_size = x_size
+		self.rows = s_size + 1
+		self.cols = x_size + s_size + 1
+		self.k = 0.0
+		self.m = numpy.zeros((self.rows, self.cols), dtype=numpy.float64)
+		self.basis = list(range(x_size, x_size + s_size))
+
+	def __str__(self):
+		tableau_str = ""
+		for row in range(self.rows):
+			if row == self.s_size:
+				tableau_str += "-" * (8 * self.cols + 2) + "\n"
+			for col in range(self.cols):
+				if col == self.x_size or col == self.x_size + self.s_size:
+					tableau_str += "|"
+				tableau_str += "{:^8}".format(format_value(self.m[row, col]))
+			if row < self.rows - 1:
+				tableau_str += "\n"
+		return tableau_str
+
+
+'''
+ * Tableau for the exact backend
+ *
+ * The true tableau is m / d: m holds Python integers and d is the one
+ * denominator shared by every cell, so pivots never normalize a gcd.
+ * scale is the common denominator the payoff was multiplied by to make
+ * it integral.
+ *
+ * m starts out as an int64 array and is promoted to Python integers
+ * (object dtype) by fit_exact_tableau once an entry reaches
+ * EXACT_INT64_BOUND, so small games pivot in native integer arithmetic.
+ '''
+
+
+class ExactTableau(Tableau):
+	__slots__ = ("d", "scale")
+
+	def __init__(self, s_size, x_size):
+		self.s_size = s_size
+		self.x_size = x_size
+		self.rows = s_size + 1
+		self.cols = x_size + s_size + 1
+		self.k = Fraction(0)
+		self.d = 1
+		self.scale = 1
+		self.m = numpy.zeros((self.rows, self.cols), dtype=numpy.int64)
+		self.basis = list(range(x_size, x_size + s_size))
+
+	def __str__(self):
+		tableau_str = ""
+		for row in range(self.rows):
+			if row == self.s_size:
+				tableau_str += "-" * (8 * self.cols + 2) + "\n"
+			for col in range(self.cols):
+				if col == self.x_size or col == self.x_size + self.s_size:
+					tableau_str += "|"
+				frac = Fraction(int(self.m[row][col]), self.d)
+				tableau_str += "{:^8}".format(format_frac(frac))
+			if row < self.rows - 1:
+				tableau_str += "\n"
+		return tableau_str
+
+
 ''''set the 2d arr to nothing'''
 
 
@@ -146,9 +288,28 @@ def free_2d_arr(arr, rows):
 
 
 def print_usage():
-	print("usage: simplex m n")
+	print("usage: simplex [options] m n")
+	print("       simplex [options] --stream[=FILE]")
 	print("\tm: number of rows, integer greater than 0")
 	print("\tn: number of columns, integer greater than 0")
+	print("options:")
+	print("\t--stream[=FILE]: solve every game in FILE (default stdin), each")
+	print("\t                 given as an \"m n\" header line followed by m rows")
+	print("\t--payoff=FILE: memory-map the payoff from a .npy file, or from a raw")
+	print("\t               binary file of m*n row-major values (m n required)")
+	print("\t--dtype=NAME: element type of a raw --payoff file, default float64")
+	print("\t--presolve[=weak]: drop strictly (or also weakly) dominated and")
+	print("\t                   duplicate strategies before solving")
+	print("\t--backend=NAME: solver backend, one of {}".format(", ".join(BACKENDS)))
+	print("\t--pivot-rule=NAME: entering variable rule, one of {}".format(", ".join(PIVOT_RULES)))
+	print("\t--quiet: print only the solution, no tableaus or pivots")
+	print("\t--profile: print time spent in ratio tests, row updates and rendering")
+	print("\t--threads[=N]: update tableau rows on N threads (default all CPUs),")
+	print("\t               float and exact backends on large games only")
+	print("\t--approximate[=EPS]: for huge games, solve by regret matching until")
+	print("\t                     the duality gap is at most EPS (default 1e-3)")
+	print("\t--cache[=DIR]: with --stream, answer repeated games (up to a shift or")
+	print("\t               reordering) from a cache, kept in DIR across runs")
 
 
 '''
@@ -164,18 +325,70 @@ def print_usage():
 def parse_args(argc: int, argv: list) -> ArgResult:
 	result = ArgResult()
 
+	# options look like --name=value and may appear anywhere
+	positional = []
+	for token in argv[1:argc]:
+		if not token.startswith("--"):
+			positional.append(token)
+			continue
+		name, _, value = token[2:].partition("=")
+		if name == "backend" and value in BACKENDS:
+			result.backend = value
+		elif name == "stream":
+			result.stream = value or "-"
+		elif name == "payoff" and value:
+			result.payoff_file = value
+		elif name == "dtype" and value:
+			result.dtype = value
+		elif name == "presolve" and (value or "strict") in presolve.PRESOLVE_MODES:
+			result.presolve_mode = value or "strict"
+		elif name == "quiet" and not value:
+			result.quiet = True
+		elif name == "profile" and not value:
+			result.profile = True
+		elif name == "pivot-rule" and value in PIVOT_RULES:
+			result.pivot_rule = value
+		elif name == "cache":
+			result.cache = value
+		elif name == "threads":
+			try:
+				result.threads = int(value) if value else os.cpu_count()
+				assert result.threads > 0
+			except (ValueError, AssertionError):
+				return result
+		elif name == "approximate":
+			try:
+				result.approximate = float(value) if value else 1e-3
+				assert result.approximate > 0
+			except (ValueError, AssertionError):
+				return result
+		else:
+			return result
+
+	# the stream carries its own game sizes
+	if result.stream is not None:
+		result.success = len(positional) == 0
+		return result
+	if result.cache is not None:
+		return result
+
+	# a .npy payoff file knows its own shape
+	if result.payoff_file is not None and result.payoff_file.endswith(".npy") and len(positional) == 0:
+		result.success = True
+		return result
+
 	# do we want to prompt for input if
 	# rows and cols not provided? - SF 10/13
-	if (argc != 3):
+	if (len(positional) != 2):
 		result.m = -1
 		result.n = -1
 		return result
 
 	# parse row and column numbers
 	try:
-		m: int = int(argv[1])
+		m: int = int(positional[0])
 		assert m > 0
-		n: int = int(argv[2])
+		n: int = int(positional[1])
 		assert n > 0
 	except Exception:
 		result.m = -1
@@ -193,15 +406,18 @@ def parse_args(argc: int, argv: list) -> ArgResult:
  *
  * m: number of rows
  * n: number of columns
+ * sparse_rows: keep only the nonzeros, as a sparse.SparsePayoff
  *
  * return: payoff result structure
  '''
 
 
-def get_payoff(m: int, n: int) -> PayoffResult:
+def get_payoff(m: int, n: int, sparse_rows=False) -> PayoffResult:
 	result = PayoffResult(m, n)
-	# initialize a mxn numpy array
-	result.payoff = numpy.zeros((m, n))
+	# initialize a mxn numpy array, object dtype keeps entries exact Fractions
+	# unless only the nonzeros are wanted
+	rows = [{} for _ in range(m)] if sparse_rows else None
+	result.payoff = numpy.zeros((m, n)).astype('object') if rows is None else None
 	result.m = m
 	result.n = n
 
@@ -227,32 +443,231 @@ def get_payoff(m: int, n: int) -> PayoffResult:
 		for col in range(0, n):
 			try:
 				num = Fraction(row_els[col])
-				result.payoff[lineNum][col] = num
+				if rows is None:
+					result.payoff[lineNum][col] = num
+				elif num != 0:
+					rows[lineNum][col] = num
 			except ValueError:
 				print("Couldn't convert input string to fraction")
 				result.success = False
-				free_2d_arr(result.payoff, m)
+				if rows is None:
+					free_2d_arr(result.payoff, m)
 				return result
 		# endfor
 		lineNum += 1
 	# endwhile
+	if rows is not None:
+		result.payoff = sparse.from_rows(rows, m, n)
+	result.success = True
+	return result
+
+
+'''
+ * Memory-maps a payoff matrix stored in a binary file
+ *
+ * .npy files carry their own shape and dtype. Any other file is read as
+ * raw row-major values of the given dtype, which needs m and n. The
+ * returned payoff is a read-only view of the file, so no per-element
+ * Python conversion happens until a backend needs one.
+ *
+ * path: payoff file
+ * m: number of rows, -1 to take it from a .npy header
+ * n: number of columns, -1 to take it from a .npy header
+ * dtype: element type of a raw file, any integer or float NumPy type
+ *
+ * return: payoff result structure
+ '''
+
+
+def load_payoff(path: str, m: int = -1, n: int = -1, dtype="float64") -> PayoffResult:
+	result = PayoffResult(m, n)
+	try:
+		if path.endswith(".npy"):
+			payoff = numpy.load(path, mmap_mode='r')
+		else:
+			payoff = numpy.memmap(path, dtype=numpy.dtype(dtype), mode='r', shape=(m, n))
+	except (OSError, ValueError, TypeError) as error:
+		print("Couldn't load payoff file {}: {}".format(path, error))
+		return result
+
+	if payoff.ndim != 2 or (m > 0 and payoff.shape != (m, n)):
+		print("Expected a {} by {} payoff matrix, got shape {}".format(m, n, payoff.shape))
+		return result
+	if not (numpy.issubdtype(payoff.dtype, numpy.integer) or numpy.issubdtype(payoff.dtype, numpy.floating)):
+		print("Payoff file must hold integers or floats, got {}".format(payoff.dtype))
+		return result
+
+	result.payoff = payoff
+	(result.m, result.n) = payoff.shape
 	result.success = True
 	return result
 
 
+'''
+ * Reads games one at a time from a multi-game stream
+ *
+ * Each game is a header line "m n" followed by its m rows. Blank lines
+ * and lines starting with # are skipped, so games can be separated and
+ * annotated freely. Only the game currently being read is kept in
+ * memory, so a stream of any length can be solved in flat memory.
+ *
+ * stream: text file object, e.g. sys.stdin
+ *
+ * return: generator of (m, n, payoff), payoff an m x n array of Fractions
+ '''
+
+
+def read_games(stream):
+	payoff = None
+	m = n = row = 0
+	for line_num, line in enumerate(stream, 1):
+		tokens = line.split()
+		if not tokens or tokens[0].startswith("#"):
+			continue
+
+		if payoff is None:
+			try:
+				m, n = int(tokens[0]), int(tokens[1])
+				assert len(tokens) == 2 and m > 0 and n > 0
+			except (ValueError, IndexError, AssertionError):
+				raise ValueError("Line {}: expected an \"m n\" game header".format(line_num))
+			payoff = numpy.zeros((m, n)).astype('object')
+			row = 0
+			continue
+
+		if len(tokens) != n:
+			raise ValueError("Line {}: expected {} entries in a row. Got {}".format(line_num, n, len(tokens)))
+		try:
+			for col in range(n):
+				payoff[row][col] = Fraction(tokens[col])
+		except ValueError:
+			raise ValueError("Line {}: couldn't convert input string to fraction".format(line_num))
+		row += 1
+
+		if row == m:
+			yield (m, n, payoff)
+			payoff = None
+
+	if payoff is not None:
+		raise ValueError("Input ended in the middle of a {} by {} game".format(m, n))
+
+
+'''
+ * Dense form of a payoff, expanding a sparse.SparsePayoff; any other
+ * payoff is returned unchanged
+ '''
+
+
+def dense_payoff(payoff):
+	if isinstance(payoff, sparse.SparsePayoff):
+		return payoff.to_dense()
+	return payoff
+
+
+'''
+ * Finds every pure-strategy saddle point of a payoff matrix
+ *
+ * An entry is a saddle point when it is the minimum of its row and the
+ * maximum of its column. Row minima and column maxima are computed once,
+ * so this is O(m*n).
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns
+ *
+ * return: list of (row, col, value), empty when there is no saddle point
+ '''
+
+
+def find_saddles(payoff, m, n) -> list:
+	if isinstance(payoff, sparse.SparsePayoff):
+		return sparse.find_saddles(payoff)
+	values = numpy.asarray(payoff).reshape(m, n)
+	row_min = values.min(axis=1)
+	col_max = values.max(axis=0)
+	mask = (values == row_min[:, None]) & (values == col_max[None, :])
+	return [(int(row), int(col), values[row, col]) for (row, col) in zip(*numpy.nonzero(mask))]
+
+
+'''
+ * Builds the pure strategies and value a saddle point solves a game with
+ *
+ * saddle: (row, col, value) from find_saddles
+ * m: number of rows
+ * n: number of columns
+ * backend: one of BACKENDS, float backends report floats, others Fractions
+ *
+ * return: (player 1 strategy, player 2 strategy, value)
+ '''
+
+
+def saddle_strategies(saddle, m, n, backend="fraction") -> Tuple[list, list, object]:
+	(row, col, value) = saddle
+	if isinstance(value, numpy.generic):
+		value = value.item()
+	one = 1.0 if backend in ("float", "revised") else Fraction(1)
+	value = float(value) if backend in ("float", "revised") else Fraction(value)
+
+	p1_strategy = [one * 0] * m
+	p2_strategy = [one * 0] * n
+	p1_strategy[row] = one
+	p2_strategy[col] = one
+	return (p1_strategy, p2_strategy, value)
+
+
+'''
+ * Solves a game with two rows or two columns from the envelope of its
+ * strategy lines (see graphical.py), without a tableau
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns, m == 2 or n == 2
+ * backend: one of BACKENDS, float backends report floats, others Fractions
+ *
+ * return: (player 1 strategy, player 2 strategy, value)
+ '''
+
+
+def graphical_strategies(payoff, m, n, backend="fraction") -> Tuple[list, list, object]:
+	(p1_strategy, p2_strategy, value) = graphical.solve_graphically(payoff, m, n)
+	if backend in ("float", "revised"):
+		return ([float(p) for p in p1_strategy], [float(q) for q in p2_strategy], float(value))
+	return (p1_strategy, p2_strategy, value)
+
+
+'''
+ * Converts a numeric NumPy payoff (e.g. memory-mapped) to nested lists of
+ * Python numbers in one C-level pass, so Fraction arithmetic never mixes
+ * with fixed-width NumPy scalars. Other payoffs are returned unchanged.
+ '''
+
+
+def as_python_payoff(payoff):
+	if isinstance(payoff, numpy.ndarray) and payoff.dtype != object:
+		return payoff.tolist()
+	return payoff
+
+
 '''
  * Builds the initial tableau using the given payoff matrix
  *
  * payoff: payoff matrix
  * m: number of rows
  * n: number of columns
+ * backend: one of TABLEAU_BACKENDS
  *
  * return: initial tableau
  '''
 
 
-def get_init_tableau(payoff, m, n) -> Tableau:
+def get_init_tableau(payoff, m, n, backend="fraction") -> Tableau:
+	if backend == "float":
+		return get_init_float_tableau(payoff, m, n)
+	if backend == "exact":
+		return get_init_exact_tableau(payoff, m, n)
+
 	tableau: Tableau = Tableau(m, n)
+	payoff = as_python_payoff(payoff)
 
 	min = sys.maxsize
 	for row in range(0, m):
@@ -262,114 +677,1119 @@ def get_init_tableau(payoff, m, n) -> Tableau:
 
 	# Python ternary assignment of booster val k
 	k = Fraction(1 - min) if (min < 1) else Fraction(0)
+	tableau.k = k
 
-	# populate the initial tableau so that every entry >=
-	# in the elif the == will eval to 1 or 0 since
-	# True or False is equiv to those respectively
-	for row in range(0, tableau.rows):
-		for col in range(0, tableau.cols):
-			if (col < n):
-				tableau.m[row][col] = Fraction(payoff[row][col] + k) \
-					if (row < m) else Fraction(-1)
-			elif (col < n + m):
-				tableau.m[row][col] = Fraction((row == col - n)) \
-					if (row < m) else Fraction(0)
-			else:
-				tableau.m[row][col] = Fraction((row < m))
+	# populate the initial tableau so that every payoff entry >= 1; the
+	# constant cells share one Fraction each, only the payoff needs its own
+	for row in range(0, m):
+		for col in range(0, n):
+			tableau.m[row][col] = Fraction(payoff[row][col] + k)
+	one = Fraction(1)
+	tableau.m[numpy.arange(m), n + numpy.arange(m)] = one
+	tableau.m[:m, -1] = one
+	tableau.m[m, :n] = Fraction(-1)
 
 	return tableau
 
 
 '''
- * Pivots the provided tableau
+ * Finds the leaving row for an entering column of any backend
+ *
+ * The row with the smallest RHS/entry ratio over the positive entries of
+ * the column leaves. Ties go to the first row, or with bland to the row
+ * whose basic variable has the smallest index, as Bland's rule requires.
+ * Exact tableaus compare ratios by cross multiplication since both sides
+ * share the denominator d.
  *
  * tableau: struct to pivot
+ * pivot_col: entering column
+ * tol: float backend entries within tol of zero are treated as zero
+ * bland: break ties by smallest basic variable
+ *
+ * return: pivot row
  '''
 
 
-def pivot_tableau(tableau: Tableau) -> Tuple[Tableau, int, int]:
-	pivot_col = np.argmin(tableau.m[tableau.rows-1])
-	min_value = sys.maxsize
-	pivot_row = Fraction(-1)
-	for row, entry in enumerate(np.swapaxes(tableau.m, 0, 1)[pivot_col][0:-1]):
-		value = Fraction(1 / entry)
-		if 0 < value < min_value:
-			min_value = value
+def ratio_test(tableau: Tableau, pivot_col, tol=EPSILON, bland=False) -> int:
+	m = tableau.m
+	if isinstance(tableau, FloatTableau):
+		column = m[:-1, pivot_col]
+		candidates = column > tol
+		if not candidates.any():
+			raise ValueError("Tableau is unbounded in column {}".format(pivot_col))
+		ratios = numpy.full(column.shape, numpy.inf)
+		numpy.divide(m[:-1, -1], column, out=ratios, where=candidates)
+		pivot_row = int(numpy.argmin(ratios))
+		if bland:
+			ties = numpy.flatnonzero(ratios <= ratios[pivot_row] + tol)
+			pivot_row = int(min(ties, key=lambda row: tableau.basis[row]))
+		return pivot_row
+
+	pivot_row = -1
+	for row in range(tableau.s_size):
+		entry = m[row][pivot_col]
+		if entry <= 0:
+			continue
+		if pivot_row < 0:
 			pivot_row = row
+			continue
+		lhs = m[row][-1] * m[pivot_row][pivot_col]
+		rhs = m[pivot_row][-1] * entry
+		if lhs < rhs or (bland and lhs == rhs and tableau.basis[row] < tableau.basis[pivot_row]):
+			pivot_row = row
+	if pivot_row < 0:
+		raise ValueError("Tableau is unbounded in column {}".format(pivot_col))
+	return pivot_row
+
+
+'''
+ * Pivots the provided tableau on the given entry
+ *
+ * tableau: struct to pivot
+ * pivot_row: row of the pivot entry
+ * pivot_col: column of the pivot entry
+ '''
+
+
+def apply_pivot(tableau: Tableau, pivot_row, pivot_col) -> Tableau:
 	pivot_value = Fraction(tableau.m[pivot_row][pivot_col])
-	prev_tableau = np.copy(tableau.m)
+	# only the pivot column is read after it is overwritten
+	prev_column = np.copy(tableau.m[:, pivot_col])
 	for col, _ in enumerate(tableau.m[pivot_row]):
 		tableau.m[pivot_row][col] = Fraction(tableau.m[pivot_row][col] / pivot_value)
 
 	for row, _ in enumerate(tableau.m):
 		for col, _ in enumerate(tableau.m[row]):
 			if row != pivot_row:
-				tableau.m[row][col] = Fraction(tableau.m[row][col] - Fraction(prev_tableau[row][pivot_col] * tableau.m[pivot_row][col]))
+				tableau.m[row][col] = Fraction(tableau.m[row][col] - Fraction(prev_column[row] * tableau.m[pivot_row][col]))
 
-	return (tableau, pivot_row, pivot_col)
+	tableau.basis[pivot_row] = pivot_col
+	return tableau
 
 
 '''
- * Runs the simplex method on the supplied payoff matrix.
+ * Pivots the provided tableau of any backend once, on the pivot chosen by
+ * Dantzig's rule (PivotRule)
  *
- * argc: number of command line arguments
- * argv: array of tokens
+ * A new rule is used for every call, so nothing remembers the bases seen
+ * so far; pivot_until_optimal keeps one rule for the whole solve and is
+ * the one guaranteed to terminate.
  *
- * return: 0 on successful execution
+ * tableau: struct to pivot
  '''
 
 
-def main():
-	# Parse inputs
-	parse_result: ArgResult = parse_args(len(sys.argv), sys.argv)
+def pivot_tableau(tableau: Tableau) -> Tuple[Tableau, int, int]:
+	(pivot_row, pivot_col) = PivotRule().select(tableau)
+	if isinstance(tableau, FloatTableau):
+		update = apply_float_pivot
+	elif isinstance(tableau, ExactTableau):
+		update = apply_exact_pivot
+	else:
+		update = apply_pivot
+	return (update(tableau, pivot_row, pivot_col), pivot_row, pivot_col)
 
-	if not parse_result.success:
-		print_usage()
-		return -1
 
-	# Get initial matrix
-	payoff_result = get_payoff(parse_result.m, parse_result.n)
+'''
+ * Builds the initial float backend tableau using the given payoff matrix
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns
+ * tableau_type: FloatTableau or a subclass of it to build
+ *
+ * return: initial tableau
+ '''
 
-	if not payoff_result.success:
-		return -1
 
-	m: int = payoff_result.m
-	n: int = payoff_result.n
+def get_init_float_tableau(payoff, m, n, tableau_type=FloatTableau) -> FloatTableau:
+	tableau: FloatTableau = tableau_type(m, n)
+	# cast straight into the tableau, memory-mapped payoffs are read once
+	block = tableau.m[:m, :n]
+	block[:] = payoff
 
-	tableau: Tableau = get_init_tableau(payoff_result.payoff, m, n)
-	order = [-1] * n
+	low = block.min()
+	tableau.k = 1.0 - low if low < 1 else 0.0
 
-	pivot_count = 0
-	# while true hype...incomplete SF 10/13
-	while True:
-		if pivot_count == 0:
-			print("Initial Tableau:")
+	block += tableau.k
+	tableau.m[m, :n] = -1.0
+	tableau.m[numpy.arange(m), n + numpy.arange(m)] = 1.0
+	tableau.m[:m, -1] = 1.0
+	return tableau
+
+
+'''
+ * Pivots a float backend tableau in place on the given entry with one
+ * rank-1 update
+ '''
+
+
+def apply_float_pivot(tableau: FloatTableau, pivot_row, pivot_col) -> FloatTableau:
+	m = tableau.m
+	m[pivot_row] /= m[pivot_row, pivot_col]
+	factors = m[:, pivot_col].copy()
+	factors[pivot_row] = 0.0
+	m -= numpy.outer(factors, m[pivot_row])
+	# the entering column is a unit vector by construction, keep it exact
+	m[:, pivot_col] = 0.0
+	m[pivot_row, pivot_col] = 1.0
+
+	tableau.basis[pivot_row] = pivot_col
+	return tableau
+
+
+'''
+ * Builds the initial exact backend tableau using the given payoff matrix
+ *
+ * The boosted payoff is multiplied by the lcm of its denominators so the
+ * constraint rows become integral. That only rescales player 2's
+ * variables, which the strategies are normalized by anyway; the value
+ * is corrected with tableau.scale in get_exact_strategies.
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns
+ * tableau_type: ExactTableau or a subclass of it to build
+ *
+ * return: initial tableau
+ '''
+
+
+def get_init_exact_tableau(payoff, m, n, tableau_type=ExactTableau) -> ExactTableau:
+	tableau: ExactTableau = tableau_type(m, n)
+	if isinstance(payoff, numpy.ndarray) and numpy.issubdtype(payoff.dtype, numpy.integer):
+		# integer arrays need no lcm scaling and are boosted in C
+		low = int(payoff.min())
+		tableau.k = Fraction(1 - low) if low < 1 else Fraction(0)
+		if int(payoff.max()) + int(tableau.k) < EXACT_INT64_BOUND:
+			tableau.m[:m, :n] = payoff.astype(numpy.int64) + int(tableau.k)
 		else:
-			print("Tableau {}:".format(pivot_count))
-		print(tableau)
+			tableau.m = tableau.m.astype(object)
+			tableau.m[:m, :n] = payoff.astype(object) + int(tableau.k)
+		tableau.m[numpy.arange(m), n + numpy.arange(m)] = 1
+		tableau.m[:m, -1] = 1
+		tableau.m[m, :n] = -1
+		return tableau
+
+	payoff = as_python_payoff(payoff)
+	values = [[Fraction(payoff[row][col]) for col in range(n)] for row in range(m)]
+
+	low = min(min(row) for row in values)
+	tableau.k = Fraction(1 - low) if low < 1 else Fraction(0)
+
+	scale = 1
+	for row in values:
+		for entry in row:
+			scale = math.lcm(scale, (entry + tableau.k).denominator)
+	tableau.scale = scale
+
+	boosted = [[((entry + tableau.k) * scale).numerator for entry in row] for row in values]
+	if max(max(row) for row in boosted) >= EXACT_INT64_BOUND:
+		tableau.m = tableau.m.astype(object)
+	for row in range(m):
+		tableau.m[row, :n] = boosted[row]
+		tableau.m[row][n + row] = 1
+		tableau.m[row][-1] = 1
+	for col in range(n):
+		tableau.m[m][col] = -1
+	return tableau
 
-		(tableau, pivot_row, pivot_col) = pivot_tableau(tableau)
-		if pivot_count < n:
-			order[pivot_count] = pivot_row
 
-		print("Pivot: ( {}, {} )\n".format(pivot_row, pivot_col))
-		pivot_count += 1
+'''
+ * Promotes an int64 exact tableau to Python integers once an entry
+ * reaches EXACT_INT64_BOUND; below it the next pivot cannot overflow
+ '''
+
+
+def fit_exact_tableau(tableau: ExactTableau):
+	if tableau.m.dtype != object and numpy.abs(tableau.m).max() >= EXACT_INT64_BOUND:
+		tableau.m = tableau.m.astype(object)
+
+
+'''
+ * Pivots an exact backend tableau in place on the given entry
+ *
+ * Fraction-free (Bareiss) update: with p the pivot entry and d the
+ * previous pivot, every other row becomes (p * row - col * pivot row) / d,
+ * where the division is always exact, and p becomes the new shared
+ * denominator. The pivot row itself is left untouched.
+ '''
+
+
+def apply_exact_pivot(tableau: ExactTableau, pivot_row, pivot_col) -> ExactTableau:
+	m = tableau.m
+	pivot_value = m[pivot_row][pivot_col]
+	column = m[:, pivot_col].copy()
+	pivot_line = m[pivot_row].copy()
+	m *= pivot_value
+	m -= numpy.outer(column, pivot_line)
+	m //= tableau.d
+	m[pivot_row] = pivot_line
+	tableau.d = int(pivot_value)
+	fit_exact_tableau(tableau)
+
+	tableau.basis[pivot_row] = pivot_col
+	return tableau
+
+
+'''
+ * Checks whether a tableau of any backend is optimal
+ *
+ * tableau: struct to check
+ *
+ * return: True when no objective entry is negative
+ '''
+
+
+def tableau_finished(tableau: Tableau) -> bool:
+	if isinstance(tableau, FloatTableau):
+		return numpy.min(tableau.m[-1, :-1]) >= -EPSILON
+	if isinstance(tableau, ExactTableau):
+		return min(tableau.m[-1, :-1]) >= 0
+	return np.min(tableau.m[tableau.rows-1]) >= 0
+
+
+'''
+ * Reads the optimal strategies and game value off a finished tableau
+ *
+ * tableau: optimal tableau of any backend
+ *
+ * return: (player 1 strategy, player 2 strategy, value)
+ '''
 
-		if np.min(tableau.m[tableau.rows-1]) >= 0:
-			break
 
-	print("Final Tableau:")
-	print(tableau)
+def get_strategies(tableau: Tableau) -> Tuple[list, list, object]:
+	if isinstance(tableau, ExactTableau):
+		return get_exact_strategies(tableau)
+
+	m: int = tableau.s_size
+	n: int = tableau.x_size
 
 	v = tableau.m[tableau.rows - 1][tableau.cols - 1]
 	value = (1 / v) - tableau.k
 
 	p1_strategy = [tableau.m[tableau.rows - 1][n + col] / v for col in range(m)]
-	p2_strategy = [tableau.m[order[index]][tableau.cols - 1] / v if order[index] >= 0 else 0 for index in range(n)]
+	p2_strategy = [0 * v] * n
+	for row, var in enumerate(tableau.basis):
+		if var < n:
+			p2_strategy[var] = tableau.m[row][tableau.cols - 1] / v
+
+	return (p1_strategy, p2_strategy, value)
 
-	print("\nPlayer 1 Optimal Strategy: (", ", ".join(format_frac(p) for p in p1_strategy), ")")
-	print("Player 2 Optimal Strategy: (", ", ".join(format_frac(q) for q in p2_strategy), ")")
-	print("Value: {}".format(format_frac(value)))
+
+'''
+ * Reads the optimal strategies and game value off a finished exact
+ * tableau, converting to Fraction only here
+ *
+ * tableau: optimal exact tableau
+ *
+ * return: (player 1 strategy, player 2 strategy, value)
+ '''
+
+
+def get_exact_strategies(tableau: ExactTableau) -> Tuple[list, list, Fraction]:
+	m: int = tableau.s_size
+	n: int = tableau.x_size
+
+	# the shared denominator d cancels out of every ratio with v
+	v = int(tableau.m[-1][-1])
+	value = Fraction(tableau.d, v * tableau.scale) - tableau.k
+
+	p1_strategy = [Fraction(int(tableau.m[-1][n + col]), v) for col in range(m)]
+	p2_strategy = [Fraction(0)] * n
+	for row, var in enumerate(tableau.basis):
+		if var < n:
+			p2_strategy[var] = Fraction(int(tableau.m[row][-1]), v)
+
+	return (p1_strategy, p2_strategy, value)
+
+
+# Pivot update function for each of TABLEAU_BACKENDS, the pivot itself is
+# chosen by a PivotRule
+PIVOT_UPDATES = {
+	"fraction": apply_pivot,
+	"float": apply_float_pivot,
+	"exact": apply_exact_pivot,
+}
+
+'''
+ * Converts tableau entries of any backend to their true float values
+ *
+ * values: entries of tableau.m
+ '''
+
+
+def true_values(tableau: Tableau, values) -> numpy.ndarray:
+	if isinstance(tableau, ExactTableau):
+		values = values / tableau.d
+	return numpy.asarray(values, dtype=numpy.float64)
+
+
+'''
+ * Dantzig's pivot rule, the base of every pivot rule
+ *
+ * The entering column is the most negative objective entry. Every rule
+ * also remembers each basis it has pivoted from; meeting one again means
+ * the pivots are cycling through degenerate bases, so the rule switches
+ * to Bland's rule, which cannot cycle, for the rest of the solve.
+ * Subclasses only override entering. A rule keeps state, so use a new
+ * one for every solve.
+ *
+ * cycling: a basis repeated and Bland's rule is in use
+ * seen: every basis pivoted from so far
+ * columns: variable held by every column of a compact tableau, which
+ *          keeps only the nonbasic variables; None when every variable
+ *          has its own column
+ '''
+
+
+class PivotRule:
+
+	def __init__(self):
+		self.cycling = False
+		self.seen = set()
+		self.columns = None
+
+	'''
+	* Chooses the pivot of an unfinished tableau of any backend
+	*
+	* return: (pivot row, pivot column)
+	'''
+
+	def select(self, tableau: Tableau) -> Tuple[int, int]:
+		tol = EPSILON if isinstance(tableau, FloatTableau) else 0
+		if not self.cycling:
+			key = frozenset(tableau.basis)
+			if key in self.seen:
+				self.cycling = True
+			self.seen.add(key)
+
+		candidates = numpy.asarray(tableau.m[-1, :-1] < -tol, dtype=bool)
+		if self.cycling:
+			# Bland's rule enters the smallest variable, not the leftmost column
+			order = numpy.flatnonzero(candidates)
+			pivot_col = int(order[0] if self.columns is None else min(order, key=self.columns.__getitem__))
+		else:
+			pivot_col = self.entering(tableau, candidates)
+		pivot_row = ratio_test(tableau, pivot_col, tol, self.cycling)
+		self.pivoting(tableau, pivot_row, pivot_col)
+		return (pivot_row, pivot_col)
+
+	'''
+	* Chooses the entering column among the candidates
+	*
+	* candidates: boolean mask of the negative objective entries
+	'''
+
+	def entering(self, tableau: Tableau, candidates) -> int:
+		return int(numpy.argmin(tableau.m[-1, :-1]))
+
+	'''
+	* Called with the chosen pivot before the tableau is updated
+	'''
+
+	def pivoting(self, tableau: Tableau, pivot_row, pivot_col):
+		pass
+
+
+'''
+ * Bland's rule: the negative objective entry with the smallest index
+ * enters and ratio test ties leave by smallest basic variable. Never
+ * cycles, but usually takes more pivots than the others.
+ '''
+
+
+class BlandRule(PivotRule):
+
+	def __init__(self):
+		PivotRule.__init__(self)
+		self.cycling = True
+
+
+'''
+ * Steepest-edge rule: the entering column maximizes obj_j^2 / (1 + |a_j|^2),
+ * the objective improvement per unit of distance moved. The tableau holds
+ * every column, so the edge norms are exact rather than estimated.
+ '''
+
+
+class SteepestEdgeRule(PivotRule):
+
+	def entering(self, tableau: Tableau, candidates) -> int:
+		objective = true_values(tableau, tableau.m[-1, :-1])
+		norms = 1.0 + (true_values(tableau, tableau.m[:-1, :-1]) ** 2).sum(axis=0)
+		scores = numpy.where(candidates, objective ** 2 / norms, -1.0)
+		return int(numpy.argmax(scores))
+
+
+'''
+ * Devex rule: steepest edge with reference weights instead of true edge
+ * norms. The weights start at 1 and are updated from the pivot row only,
+ * which costs O(n) per pivot instead of a pass over the whole tableau.
+ *
+ * weights: reference weight of every column
+ '''
+
+
+class DevexRule(PivotRule):
+
+	def __init__(self):
+		PivotRule.__init__(self)
+		self.weights = None
+
+	def entering(self, tableau: Tableau, candidates) -> int:
+		if self.weights is None:
+			self.weights = numpy.ones(tableau.cols - 1)
+		objective = true_values(tableau, tableau.m[-1, :-1])
+		scores = numpy.where(candidates, objective ** 2 / self.weights, -1.0)
+		return int(numpy.argmax(scores))
+
+	def pivoting(self, tableau: Tableau, pivot_row, pivot_col):
+		if self.weights is None:
+			return
+		row = true_values(tableau, tableau.m[pivot_row, :-1])
+		alpha = row / row[pivot_col]
+		leaving = tableau.basis[pivot_row]
+		pivot_weight = self.weights[pivot_col]
+		self.weights = numpy.maximum(self.weights, alpha ** 2 * pivot_weight)
+		if self.columns is None:
+			self.weights[leaving] = max(pivot_weight / row[pivot_col] ** 2, 1.0)
+			self.weights[pivot_col] = 1.0
+		else:
+			# in a compact tableau the leaving variable takes over the pivot column
+			self.weights[pivot_col] = max(pivot_weight / row[pivot_col] ** 2, 1.0)
+
+
+# PivotRule class for each name accepted by --pivot-rule
+PIVOT_RULES = {
+	"dantzig": PivotRule,
+	"bland": BlandRule,
+	"steepest": SteepestEdgeRule,
+	"devex": DevexRule,
+}
+
+'''
+ * Current objective of a tableau of any backend, the sum of player 2's
+ * unnormalized variables; the game value is 1 / objective - k at the end
+ '''
+
+
+def tableau_objective(tableau: Tableau):
+	if isinstance(tableau, ExactTableau):
+		return Fraction(int(tableau.m[-1][-1]) * tableau.scale, tableau.d)
+	return tableau.m[tableau.rows - 1][tableau.cols - 1]
+
+
+'''
+ * Description of one finished pivot, handed to every solve loop observer
+ *
+ * index: pivot number, starting at 1
+ * pivot_row: constraint row the pivot happened in
+ * entering: variable that entered the basis, x_j is j and s_i is n + i
+ * leaving: variable that left the basis
+ * objective: objective after the pivot
+ * select_time: seconds spent choosing the pivot (pricing and ratio test)
+ * update_time: seconds spent updating the tableau or basis
+ * solver: the tableau, revised.RevisedSimplex or sparse.SparseSimplex,
+ *         after the pivot
+ '''
+
+
+class PivotEvent:
+
+	def __init__(self, index, pivot_row, entering, leaving, objective, select_time, update_time, solver):
+		self.index = index
+		self.pivot_row = pivot_row
+		self.entering = entering
+		self.leaving = leaving
+		self.objective = objective
+		self.select_time = select_time
+		self.update_time = update_time
+		self.solver = solver
+
+
+'''
+ * Observer that prints every tableau the way the command line always has
+ *
+ * profiler: Profiler charged with the time spent rendering, if any
+ '''
+
+
+class TableauPrinter:
+
+	def __init__(self, profiler=None):
+		self.profiler = profiler
+
+	def render(self, title, tableau):
+		start = time.perf_counter()
+		text = str(tableau)
+		if self.profiler is not None:
+			self.profiler.render_time += time.perf_counter() - start
+		print(title)
+		print(text)
+
+	def __call__(self, event: PivotEvent):
+		print("Pivot: ( {}, {} )\n".format(event.pivot_row, event.entering))
+		if tableau_finished(event.solver):
+			self.render("Final Tableau:", event.solver)
+		else:
+			self.render("Tableau {}:".format(event.index), event.solver)
+
+
+'''
+ * Observer that adds up where the solve loop spent its time
+ *
+ * pivots: pivots seen
+ * select_time: seconds spent choosing pivots, mostly the ratio test
+ * update_time: seconds spent on row updates
+ * render_time: seconds spent formatting tableaus, filled in by TableauPrinter
+ '''
+
+
+class Profiler:
+
+	def __init__(self):
+		self.pivots = 0
+		self.select_time = 0.0
+		self.update_time = 0.0
+		self.render_time = 0.0
+
+	def __call__(self, event: PivotEvent):
+		self.pivots += 1
+		self.select_time += event.select_time
+		self.update_time += event.update_time
+
+	def summary(self) -> str:
+		total = self.select_time + self.update_time + self.render_time
+		lines = ["Profile: {} pivots, {:.6f}s".format(self.pivots, total)]
+		for (name, seconds) in (("ratio test", self.select_time), ("row updates", self.update_time), ("rendering", self.render_time)):
+			share = 100 * seconds / total if total > 0 else 0.0
+			lines.append("\t{:<12} {:.6f}s {:5.1f}%".format(name, seconds, share))
+		return "\n".join(lines)
+
+
+'''
+ * Pivots a tableau until it is optimal, reporting every pivot
+ *
+ * tableau: initial tableau of the given backend, pivoted in place
+ * backend: one of TABLEAU_BACKENDS
+ * observers: callables given a PivotEvent after every pivot
+ * rule: PivotRule choosing the pivots, Dantzig's rule by default
+ * update: applies a chosen pivot, PIVOT_UPDATES[backend] by default or a
+ *         parallel.ParallelPivot
+ *
+ * return: number of pivots
+ '''
+
+
+def pivot_until_optimal(tableau: Tableau, backend, observers=(), rule=None, update=None) -> int:
+	if rule is None:
+		rule = PivotRule()
+	if update is None:
+		update = PIVOT_UPDATES[backend]
+	pivot_count = 0
+	while not tableau_finished(tableau):
+		start = time.perf_counter()
+		(pivot_row, pivot_col) = rule.select(tableau)
+		selected = time.perf_counter()
+		leaving = tableau.basis[pivot_row]
+		update(tableau, pivot_row, pivot_col)
+		updated = time.perf_counter()
+		pivot_count += 1
+
+		if observers:
+			event = PivotEvent(pivot_count, pivot_row, pivot_col, leaving, tableau_objective(tableau),
+								selected - start, updated - selected, tableau)
+			for observer in observers:
+				observer(event)
+	return pivot_count
+
+
+'''
+ * Solves a game on a tableau backend, printing every tableau on the way
+ * unless quiet
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns
+ * backend: one of TABLEAU_BACKENDS
+ * observers: callables given a PivotEvent after every pivot
+ * quiet: never render a tableau
+ * profiler: Profiler to charge rendering time to, if any
+ * pivot_rule: name from PIVOT_RULES
+ * threads: update rows on this many threads (parallel.ParallelPivot),
+ *          None or 1 for the serial update
+ *
+ * return: (player 1 strategy, player 2 strategy, value)
+ '''
+
+
+def run_tableau(payoff, m, n, backend, observers=(), quiet=False, profiler=None, pivot_rule="dantzig", threads=None):
+	tableau: Tableau = get_init_tableau(payoff, m, n, backend)
+
+	observers = list(observers)
+	if not quiet:
+		printer = TableauPrinter(profiler)
+		printer.render("Initial Tableau:", tableau)
+		observers.insert(0, printer)
+
+	with parallel_update(threads, backend) as update:
+		pivot_until_optimal(tableau, backend, observers, PIVOT_RULES[pivot_rule](), update)
+	return get_strategies(tableau)
+
+
+'''
+ * Context giving the pivot update of a tableau backend for a thread
+ * count: a parallel.ParallelPivot, shut down on exit, for more than one
+ * thread, otherwise None for the serial update
+ '''
+
+
+@contextlib.contextmanager
+def parallel_update(threads, backend):
+	if threads is None or threads <= 1:
+		yield None
+		return
+	import parallel
+	with parallel.ParallelPivot(backend, threads) as update:
+		yield update
+
+
+'''
+ * Solves a game with the revised simplex engine, printing every pivot
+ * unless quiet
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns
+ * observers: callables given a PivotEvent after every pivot
+ * quiet: do not print pivots
+ *
+ * return: (player 1 strategy, player 2 strategy, value)
+ '''
+
+
+def run_revised(payoff, m, n, observers=(), quiet=False):
+	return run_solver(revised.RevisedSimplex(payoff, m, n), observers, quiet)
+
+
+'''
+ * Float-then-exact solver of the hybrid backend, a certify.HybridSimplex;
+ * certify is imported here since it builds on this module
+ '''
+
+
+def hybrid_solver(payoff, m, n):
+	import certify
+	return certify.HybridSimplex(payoff, m, n)
+
+
+'''
+ * Pivots a revised.RevisedSimplex, sparse.SparseSimplex or
+ * certify.HybridSimplex to optimality, printing every pivot unless quiet
+ *
+ * solver: solver with select_pivot, replace, objective and get_strategies
+ * observers: callables given a PivotEvent after every pivot
+ * quiet: print nothing but the solution
+ *
+ * return: (player 1 strategy, player 2 strategy, value)
+ '''
+
+
+def run_solver(solver, observers=(), quiet=False):
+	while True:
+		start = time.perf_counter()
+		(pivot_row, pivot_col, w) = solver.select_pivot()
+		if pivot_row < 0:
+			break
+		selected = time.perf_counter()
+		leaving = solver.basis[pivot_row]
+		solver.replace(pivot_row, pivot_col, w)
+		updated = time.perf_counter()
+
+		if not quiet:
+			print("Pivot: ( {}, {} )".format(pivot_row, pivot_col))
+		if observers:
+			event = PivotEvent(solver.pivot_count, pivot_row, pivot_col, leaving, solver.objective(),
+								selected - start, updated - selected, solver)
+			for observer in observers:
+				observer(event)
+
+	if not quiet:
+		print("\nPivots: {}".format(solver.pivot_count))
+	return solver.get_strategies()
+
+
+'''
+ * Result of solving a game
+ *
+ * p1_strategy: optimal mixed strategy of the row player
+ * p2_strategy: optimal mixed strategy of the column player
+ * value: value of the game
+ * pivots: simplex pivots performed, 0 for a saddle point
+ * basis: final basis, basis[row] is the variable basic in that
+ *        constraint row (x_j is j, s_i is n + i); None when no simplex
+ *        ran on the game itself (a saddle point, two rows or columns, or
+ *        a game solved through its symmetry classes)
+ * backend: backend that solved the game
+ '''
+
+
+class GameSolution:
+
+	def __init__(self, p1_strategy, p2_strategy, value, pivots, basis, backend):
+		self.p1_strategy = p1_strategy
+		self.p2_strategy = p2_strategy
+		self.value = value
+		self.pivots = pivots
+		self.basis = basis
+		self.backend = backend
+
+	def __repr__(self):
+		return "GameSolution(value={}, pivots={}, backend={!r})".format(format_value(self.value), self.pivots, self.backend)
+
+
+'''
+ * Solves a skew-symmetric game on a tableau backend
+ *
+ * The value is 0 and player 1 can play player 2's optimal strategy, so
+ * only player 2's half of the problem is solved. The slack columns, which
+ * only exist to read player 1's strategy off the objective row, are
+ * dropped: the compact tableau keeps one column per nonbasic variable and
+ * every pivot exchanges the entering variable's column for the leaving
+ * one's, about half the work of a full pivot on a square game. The
+ * optimal objective, 1 / k, is known in advance, so pivoting also stops
+ * as soon as the basis reaches it.
+ *
+ * payoff: m x m skew-symmetric payoff matrix
+ * m: number of rows and columns
+ * backend: one of TABLEAU_BACKENDS
+ * pivot_rule: name from PIVOT_RULES
+ * update: applies a chosen pivot, PIVOT_UPDATES[backend] by default
+ *
+ * return: GameSolution
+ '''
+
+
+def solve_skew_symmetric(payoff, m, backend="fraction", pivot_rule="dantzig", update=None) -> GameSolution:
+	tableau: Tableau = get_init_tableau(payoff, m, m, backend)
+	# the fancy index hands back a Fortran-ordered copy, row updates want C
+	tableau.m = numpy.ascontiguousarray(tableau.m[:, list(range(m)) + [-1]])
+	tableau.cols = m + 1
+	# variable of every column, x_j is j and s_i is m + i
+	nonbasic = list(range(m))
+	if update is None:
+		update = PIVOT_UPDATES[backend]
+	rule = PIVOT_RULES[pivot_rule]()
+	rule.columns = nonbasic
+	tol = EPSILON if backend == "float" else 0
+	target = 1 / tableau.k
+	pivots = 0
+
+	while not tableau_finished(tableau) and tableau_objective(tableau) < target - tol:
+		(pivot_row, pivot_col) = rule.select(tableau)
+		column = tableau.m[:, pivot_col].copy()
+		leaving = int(tableau.basis[pivot_row])
+		previous_d = tableau.d if backend == "exact" else None
+		update(tableau, pivot_row, pivot_col)
+
+		# the entering column becomes the leaving variable's, in Bareiss
+		# numerators over the new denominator for the exact backend
+		if backend == "exact":
+			tableau.m[:, pivot_col] = -column
+			tableau.m[pivot_row, pivot_col] = previous_d
+		else:
+			tableau.m[:, pivot_col] = -column / column[pivot_row]
+			tableau.m[pivot_row, pivot_col] = 1 / column[pivot_row]
+		tableau.basis[pivot_row] = nonbasic[pivot_col]
+		nonbasic[pivot_col] = leaving
+		pivots += 1
+
+	v = tableau.m[-1][-1]
+	strategy = [0 * tableau.k] * m
+	for row, var in enumerate(tableau.basis):
+		if var < m:
+			rhs = tableau.m[row][-1]
+			strategy[var] = Fraction(int(rhs), int(v)) if backend == "exact" else rhs / v
+	if backend == "float":
+		strategy = [float(q) for q in strategy]
+	return GameSolution(list(strategy), strategy, strategy[0] * 0, pivots, [int(var) for var in tableau.basis], backend)
+
+
+'''
+ * Solves a game without printing anything
+ *
+ * Games with a saddle point are answered from it, and games with two rows
+ * or two columns by graphical_strategies, without running simplex.
+ * Skew-symmetric games stop pivoting early (solve_skew_symmetric), and
+ * games whose rows or columns fall into symmetry classes are solved on
+ * the smaller game of class averages (symmetry.reduce_symmetric).
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns
+ * backend: one of BACKENDS
+ * presolve_mode: one of presolve.PRESOLVE_MODES, None to skip presolve
+ * pivot_rule: name from PIVOT_RULES, the revised and sparse backends
+ *             always use Dantzig's rule
+ * threads: threads updating tableau rows, None or 1 for serial updates
+ *
+ * The sparse backend goes straight to sparse.SparseSimplex after the
+ * saddle check, since the other reductions work on dense payoffs; a
+ * sparse.SparsePayoff given to any other backend is expanded first.
+ *
+ * return: GameSolution
+ '''
+
+
+def solve_sized_game(payoff, m, n, backend="exact", presolve_mode=None, pivot_rule="dantzig",
+						threads=None) -> GameSolution:
+	if backend != "sparse":
+		payoff = dense_payoff(payoff)
+	saddles = find_saddles(payoff, m, n)
+	if saddles:
+		return GameSolution(*saddle_strategies(saddles[0], m, n, backend), 0, None, backend)
+
+	if backend == "sparse":
+		solver = sparse.SparseSimplex(payoff, m, n)
+		while solver.pivot()[0] >= 0:
+			pass
+		return GameSolution(*solver.get_strategies(), solver.pivot_count, list(solver.basis), backend)
+
+	if m == 2 or n == 2:
+		return GameSolution(*graphical_strategies(payoff, m, n, backend), 0, None, backend)
+
+	if presolve_mode is not None:
+		reduced = presolve.presolve(payoff, m, n, presolve_mode == "weak")
+		solution = solve_sized_game(reduced.payoff, reduced.m, reduced.n, backend, None, pivot_rule, threads)
+		(solution.p1_strategy, solution.p2_strategy) = reduced.expand(solution.p1_strategy, solution.p2_strategy)
+		if solution.basis is not None:
+			solution.basis = reduced.expand_basis(solution.basis)
+		return solution
+
+	if backend in TABLEAU_BACKENDS and symmetry.is_skew_symmetric(payoff, m, n):
+		with parallel_update(threads, backend) as update:
+			return solve_skew_symmetric(payoff, m, backend, pivot_rule, update)
+
+	classes = symmetry.reduce_symmetric(payoff, m, n)
+	if classes is not None:
+		solution = solve_sized_game(classes.payoff, classes.m, classes.n, backend, None, pivot_rule, threads)
+		(solution.p1_strategy, solution.p2_strategy) = classes.expand(solution.p1_strategy, solution.p2_strategy)
+		# a uniform mix over a class is no vertex of the original problem
+		solution.basis = None
+		return solution
+
+	if backend in ("revised", "hybrid"):
+		solver = revised.RevisedSimplex(payoff, m, n) if backend == "revised" else hybrid_solver(payoff, m, n)
+		while solver.pivot()[0] >= 0:
+			pass
+		return GameSolution(*solver.get_strategies(), solver.pivot_count, list(solver.basis), backend)
+
+	tableau: Tableau = get_init_tableau(payoff, m, n, backend)
+	with parallel_update(threads, backend) as update:
+		pivots = pivot_until_optimal(tableau, backend, rule=PIVOT_RULES[pivot_rule](), update=update)
+	return GameSolution(*get_strategies(tableau), pivots, [int(var) for var in tableau.basis], backend)
+
+
+'''
+ * Solves a game without printing anything
+ *
+ * payoff: payoff matrix
+ * m: number of rows
+ * n: number of columns
+ * backend: one of BACKENDS, exact by default like solve_game
+ * presolve_mode: one of presolve.PRESOLVE_MODES, None to skip presolve
+ * pivot_rule: name from PIVOT_RULES
+ *
+ * return: (player 1 strategy, player 2 strategy, value)
+ '''
+
+
+def solve_payoff(payoff, m, n, backend="exact", presolve_mode=None, pivot_rule="dantzig"):
+	solution = solve_sized_game(payoff, m, n, backend, presolve_mode, pivot_rule)
+	return (solution.p1_strategy, solution.p2_strategy, solution.value)
+
+
+'''
+ * Library entry point: solves a two person, zero-sum game
+ *
+ * Does no I/O. The default exact backend, also that of solve_payoff,
+ * gives Fraction answers like the command line does; "float" and
+ * "revised" are faster and give floats, and "hybrid" pivots in floats
+ * but still gives certified Fractions.
+ *
+ * payoff: m x n payoff matrix as nested lists, a NumPy array, either
+ *         holding Fractions, or a sparse.SparsePayoff
+ * backend: one of BACKENDS
+ * presolve_mode: one of presolve.PRESOLVE_MODES, None to skip presolve
+ * pivot_rule: name from PIVOT_RULES
+ * threads: threads updating tableau rows (parallel.ParallelPivot), None
+ *          or 1 for the serial update
+ *
+ * return: GameSolution
+ '''
+
+
+def solve_game(payoff, backend="exact", presolve_mode=None, pivot_rule="dantzig", threads=None) -> GameSolution:
+	if backend not in BACKENDS:
+		raise ValueError("Unknown backend {}".format(backend))
+	if pivot_rule not in PIVOT_RULES:
+		raise ValueError("Unknown pivot rule {}".format(pivot_rule))
+	if presolve_mode is not None and presolve_mode not in presolve.PRESOLVE_MODES:
+		raise ValueError("Unknown presolve mode {}".format(presolve_mode))
+	if isinstance(payoff, sparse.SparsePayoff):
+		(m, n) = payoff.shape
+		return solve_sized_game(payoff, m, n, backend, presolve_mode, pivot_rule, threads)
+	values = numpy.asarray(payoff)
+	if values.ndim != 2 or values.size == 0:
+		raise ValueError("Payoff must be a non-empty m x n matrix")
+	(m, n) = values.shape
+	return solve_sized_game(values, m, n, backend, presolve_mode, pivot_rule, threads)
+
+
+'''
+ * Prints the optimal strategies and value of a solved game
+ '''
+
+
+def print_solution(p1_strategy, p2_strategy, value):
+	print("Player 1 Optimal Strategy: (", ", ".join(format_value(p) for p in p1_strategy), ")")
+	print("Player 2 Optimal Strategy: (", ", ".join(format_value(q) for q in p2_strategy), ")")
+	print("Value: {}".format(format_value(value)))
+
+
+'''
+ * Solves every game of a multi-game stream, printing each result as soon
+ * as its game is solved
+ *
+ * path: file to read, "-" for stdin
+ * backend: one of BACKENDS
+ * presolve_mode: one of presolve.PRESOLVE_MODES, None to skip presolve
+ * pivot_rule: name from PIVOT_RULES
+ * cache_path: cache.SolutionCache directory, "" for a memory-only cache,
+ *             None to solve every game
+ *
+ * return: 0 on success, -1 on malformed input
+ '''
+
+
+def run_stream(path, backend, presolve_mode=None, pivot_rule="dantzig", cache_path=None):
+	solver = None
+	if cache_path is not None:
+		# imported here since cache itself builds on this module
+		import cache
+		solver = cache.SolutionCache(path=cache_path or None, permute=True)
+
+	stream = sys.stdin if path == "-" else open(path)
+	try:
+		for count, (m, n, payoff) in enumerate(read_games(stream), 1):
+			if solver is not None:
+				solution = solver.solve(payoff, backend, presolve_mode, pivot_rule)
+			else:
+				solution = solve_sized_game(payoff, m, n, backend, presolve_mode, pivot_rule)
+			print("Game {} ({} x {}):".format(count, m, n))
+			print_solution(solution.p1_strategy, solution.p2_strategy, solution.value)
+			print(flush=True)
+	except ValueError as error:
+		print(error)
+		return -1
+	finally:
+		if stream is not sys.stdin:
+			stream.close()
+	return 0
+
+
+'''
+ * Runs the simplex method on the supplied payoff matrix.
+ *
+ * argc: number of command line arguments
+ * argv: array of tokens
+ *
+ * return: 0 on successful execution
+ '''
+
+
+def main():
+	# Parse inputs
+	parse_result: ArgResult = parse_args(len(sys.argv), sys.argv)
+
+	if not parse_result.success:
+		print_usage()
+		return -1
+
+	if parse_result.stream is not None:
+		return run_stream(parse_result.stream, parse_result.backend, parse_result.presolve_mode,
+							parse_result.pivot_rule, parse_result.cache)
+
+	# Get initial matrix
+	if parse_result.payoff_file is not None:
+		payoff_result = load_payoff(parse_result.payoff_file, parse_result.m, parse_result.n, parse_result.dtype)
+	else:
+		payoff_result = get_payoff(parse_result.m, parse_result.n, parse_result.backend == "sparse")
+
+	if not payoff_result.success:
+		return -1
+
+	payoff = payoff_result.payoff
+	m: int = payoff_result.m
+	n: int = payoff_result.n
+
+	saddles = find_saddles(payoff, m, n)
+	if saddles:
+		(row, col, _) = saddles[0]
+		print("Saddle point at ( {}, {} ), no pivoting needed\n".format(row, col))
+		print_solution(*saddle_strategies(saddles[0], m, n, parse_result.backend))
+		return 0
+
+	if parse_result.approximate is not None:
+		solution = approximate.solve_approximate(dense_payoff(payoff), parse_result.approximate)
+		print_solution(solution.p1_strategy, solution.p2_strategy, solution.value)
+		print("Value between {} and {}, duality gap {} after {} iterations".format(format_value(solution.lower),
+				format_value(solution.upper), format_value(solution.gap), solution.iterations))
+		return 0
+
+	if m == 2 or n == 2:
+		print("Two {}, solved graphically, no pivoting needed\n".format("rows" if m == 2 else "columns"))
+		print_solution(*graphical_strategies(dense_payoff(payoff), m, n, parse_result.backend))
+		return 0
+
+	reduced = None
+	if parse_result.presolve_mode is not None:
+		reduced = presolve.presolve(dense_payoff(payoff), m, n, parse_result.presolve_mode == "weak")
+		print("Presolve kept rows {} and columns {}\n".format(reduced.rows, reduced.cols))
+		(payoff, m, n) = (reduced.payoff, reduced.m, reduced.n)
+
+	profiler = Profiler() if parse_result.profile else None
+	observers = [profiler] if profiler is not None else []
+	if parse_result.backend == "revised":
+		(p1_strategy, p2_strategy, value) = run_revised(payoff, m, n, observers, parse_result.quiet)
+	elif parse_result.backend == "hybrid":
+		solver = hybrid_solver(payoff, m, n)
+		(p1_strategy, p2_strategy, value) = run_solver(solver, observers, parse_result.quiet)
+		if not parse_result.quiet:
+			if solver.certified:
+				print("Float basis certified optimal in exact arithmetic")
+			else:
+				print("Certificate failed, {} exact pivots".format(solver.exact_pivots))
+	elif parse_result.backend == "sparse":
+		solver = sparse.SparseSimplex(payoff, m, n)
+		(p1_strategy, p2_strategy, value) = run_solver(solver, observers, parse_result.quiet)
+		if not parse_result.quiet:
+			print("Nonzeros: {}, fill-in: {}".format(solver.nnz(), solver.fill_in))
+	else:
+		(p1_strategy, p2_strategy, value) = run_tableau(payoff, m, n, parse_result.backend, observers,
+														parse_result.quiet, profiler, parse_result.pivot_rule,
+														parse_result.threads)
+
+	if reduced is not None:
+		(p1_strategy, p2_strategy) = reduced.expand(p1_strategy, p2_strategy)
+
+	if not parse_result.quiet:
+		print()
+	print_solution(p1_strategy, p2_strategy, value)
+	if profiler is not None:
+		print()
+		print(profiler.summary())
 
 	return 0
 
@@ -7,9 +7,22 @@ from fractions import Fraction
 import os  # Could be useful for saving output to file if desired
 import tkinter as tk  # GUI
 from functools import partial  # Helper for GUI methods
+import queue  # Worker thread to Tk messages
+import threading  # Background solver worker
 
 import numpy as np
 
+import graphical  # Envelope of 2 x n and m x 2 games
+import simplex  # Shared solver backends
+
+# Milliseconds between checks on a running background job
+POLL_INTERVAL = 50
+
+# Size and margin of the graphical solution plot, in pixels
+PLOT_WIDTH = 480
+PLOT_HEIGHT = 360
+PLOT_MARGIN = 40
+
 
 def format_frac(frac):
 	if frac.numerator == 0:
@@ -32,18 +45,20 @@ def format_frac(frac):
 
 
 class Tableau:
+	__slots__ = ("s_size", "x_size", "rows", "cols", "k", "m", "basis", "finished", "rule")
+
 	# this is equivalent to create_tableau in Aidan's simplex.c
 	def __init__(self, base_rows, base_cols):
+		self.s_size = base_rows
+		self.x_size = base_cols
 		self.rows = base_rows + 1
 		self.cols = base_cols + base_rows + 1
 		self.k = 0
-		# print( self.rows, self.cols, "in tableau constructor")
-		# numpy makes 2 for loops in C into a line of code - SF 10/13
-		self.m = numpy.zeros((self.rows, self.cols)).astype('object')  # Generate m here
-		for row, _ in enumerate(self.m):
-			for col, _ in enumerate(self.m[row]):
-				self.m[row][col] = Fraction(0)
+		# one shared immutable zero, built in a single allocation
+		self.m = numpy.full((self.rows, self.cols), Fraction(0), dtype=object)
+		self.basis = list(range(base_cols, base_cols + base_rows))
 		self.finished = False
+		self.rule = simplex.PivotRule()
 
 	# equivalent to print_tableau in Aidan's simplex.c
 	def __str__(self):
@@ -61,38 +76,245 @@ class Tableau:
 				tableau_str += "\n"
 		return tableau_str
 
+	def apply_pivot(self, pivot_row, pivot_col):
+		simplex.apply_pivot(self, pivot_row, pivot_col)
+
 	def pivot_tableau(self):
-		pivot_col = np.argmin(self.m[self.rows - 1])
-		min_value = sys.maxsize
-		pivot_row = Fraction(-1)
-		for row, entry in enumerate(np.swapaxes(self.m, 0, 1)[pivot_col][0:-1]):
-			if (entry == 0):
-				value = 0
-			else:
-				value = Fraction(self.m[row][self.cols-1] / entry)
-			if 0 < value < min_value:
-				min_value = value
-				pivot_row = row
-		if pivot_row == Fraction(-1):
+		if self.finished or simplex.tableau_finished(self):
 			self.finished = True
-			return
-		if np.min(self.m[-1]) >= 0:
+			return None
+		(pivot_row, pivot_col) = self.rule.select(self)
+		pivot_value = Fraction(self.m[pivot_row][pivot_col])
+		print("Pivoted at value " + str(pivot_value - self.k) + ", row " + str(pivot_row+1) + ", column " + str(pivot_col+1))
+		self.apply_pivot(pivot_row, pivot_col)
+		return (pivot_row, pivot_col)
+
+
+'''
+ * Float backend tableau with the same stepping interface as Tableau
+ '''
+
+
+class FloatTableau(simplex.FloatTableau):
+	__slots__ = ("finished", "rule")
+
+	def __init__(self, base_rows, base_cols):
+		simplex.FloatTableau.__init__(self, base_rows, base_cols)
+		self.finished = False
+		self.rule = simplex.PivotRule()
+
+	def apply_pivot(self, pivot_row, pivot_col):
+		simplex.apply_float_pivot(self, pivot_row, pivot_col)
+
+	def pivot_tableau(self):
+		if self.finished or simplex.tableau_finished(self):
 			self.finished = True
+			return None
+		(pivot_row, pivot_col) = self.rule.select(self)
+		self.apply_pivot(pivot_row, pivot_col)
+		return (pivot_row, pivot_col)
+
+
+'''
+ * Exact backend tableau with the same stepping interface as Tableau
+ '''
+
+
+class ExactTableau(simplex.ExactTableau):
+	__slots__ = ("finished", "rule")
+
+	def __init__(self, base_rows, base_cols):
+		simplex.ExactTableau.__init__(self, base_rows, base_cols)
+		self.finished = False
+		self.rule = simplex.PivotRule()
+
+	def apply_pivot(self, pivot_row, pivot_col):
+		simplex.apply_exact_pivot(self, pivot_row, pivot_col)
+
+	def pivot_tableau(self):
+		if self.finished or simplex.tableau_finished(self):
+			self.finished = True
+			return None
+		(pivot_row, pivot_col) = self.rule.select(self)
+		self.apply_pivot(pivot_row, pivot_col)
+		return (pivot_row, pivot_col)
+
+
+'''
+ * Step-through history of one GUI tableau, for the Previous and Next
+ * Pivot buttons
+ *
+ * Only the (row, column, leaving variable) of every pivot is kept. Exact
+ * tableaus step back with an inverse pivot: pivoting the leaving
+ * variable back into the same row restores the previous tableau exactly.
+ * Float tableaus also keep a copy every interval pivots, restore the
+ * nearest one and replay the recorded pivots, which gives the same
+ * floats bit for bit. Past MAX_CHECKPOINTS every other checkpoint
+ * is dropped and the interval doubles, so memory stays bounded however
+ * long the solve.
+ *
+ * tableau: tableau being stepped, changed in place
+ * pivots: (pivot row, pivot column, leaving variable) of every step seen
+ * position: number of those pivots currently applied
+ * interval: pivots between checkpoints
+ * checkpoints: float tableau snapshot for every step divisible by interval
+ '''
+
+
+class PivotHistory:
+	CHECKPOINT_INTERVAL = 16
+	MAX_CHECKPOINTS = 32
+
+	def __init__(self, tableau):
+		self.tableau = tableau
+		self.pivots = []
+		self.position = 0
+		self.interval = self.CHECKPOINT_INTERVAL
+		self.exact = not isinstance(tableau, simplex.FloatTableau)
+		self.checkpoints = {0: self.snapshot()}
+
+	def snapshot(self):
+		return (self.tableau.m.copy(), list(self.tableau.basis), getattr(self.tableau, "d", None))
+
+	def restore(self, snapshot):
+		(m, basis, d) = snapshot
+		self.tableau.m = m.copy()
+		self.tableau.basis = list(basis)
+		if d is not None:
+			self.tableau.d = d
+
+	'''
+	* Redoes the next recorded pivot, or takes a new one
+	*
+	* return: False if the tableau was already optimal
+	'''
+
+	def next(self) -> bool:
+		if self.position < len(self.pivots):
+			(pivot_row, pivot_col, _) = self.pivots[self.position]
+			self.tableau.apply_pivot(pivot_row, pivot_col)
+		else:
+			basis = list(self.tableau.basis)
+			step = self.tableau.pivot_tableau()
+			if step is None:
+				return False
+			(pivot_row, pivot_col) = step
+			self.pivots.append((pivot_row, pivot_col, basis[pivot_row]))
+		self.position += 1
+		if not self.exact and self.position % self.interval == 0 and self.position not in self.checkpoints:
+			self.checkpoints[self.position] = self.snapshot()
+			self.thin()
+		return True
+
+	'''
+	* Steps back one pivot
+	*
+	* return: False if already at the initial tableau
+	'''
+
+	def previous(self) -> bool:
+		if self.position == 0:
+			return False
+		target = self.position - 1
+		(pivot_row, _, leaving) = self.pivots[target]
+		if self.exact:
+			self.tableau.apply_pivot(pivot_row, leaving)
+		else:
+			start = max(step for step in self.checkpoints if step <= target)
+			self.restore(self.checkpoints[start])
+			for (row, col, _) in self.pivots[start:target]:
+				self.tableau.apply_pivot(row, col)
+		self.tableau.finished = False
+		self.position = target
+		return True
+
+	def thin(self):
+		if len(self.checkpoints) <= self.MAX_CHECKPOINTS:
 			return
-		pivot_value = Fraction(self.m[pivot_row][pivot_col])
-		if (self.finished == False):
-			print("Pivoted at value " + str(pivot_value - self.k) + ", row " + str(pivot_row+1) + ", column " + str(pivot_col+1))
-		prev_tableau = np.copy(self.m)
-		for col, _ in enumerate(self.m[pivot_row]):
-			self.m[pivot_row][col] = Fraction(self.m[pivot_row][col] / pivot_value)
+		self.interval *= 2
+		self.checkpoints = {step: snapshot for (step, snapshot) in self.checkpoints.items() if step % self.interval == 0}
+
+
+'''
+ * Runs one solver job at a time on a background thread so the Tk event
+ * loop never blocks
+ *
+ * A job is called as job(report, cancelled) on the worker thread; it
+ * passes progress text to report, returns early once cancelled() is true,
+ * and returns its result. The worker thread never touches Tk: poll runs
+ * on the Tk thread through after() and hands the latest progress and the
+ * result to the callbacks.
+ *
+ * widget: Tk widget whose after() schedules the polling
+ * messages: ("progress" | "done" | "error", payload) from the worker
+ * cancel_event: set to ask the running job to stop
+ '''
 
-		for row, _ in enumerate(self.m):
-			for col, _ in enumerate(self.m[row]):
-				if row != pivot_row:
-					self.m[row][col] = Fraction(
-						self.m[row][col] - Fraction(prev_tableau[row][pivot_col] * self.m[pivot_row][col]))
-		return
 
+class SolveWorker:
+
+	def __init__(self, widget):
+		self.widget = widget
+		self.messages = queue.Queue()
+		self.cancel_event = threading.Event()
+		self.thread = None
+		self.on_progress = None
+		self.on_done = None
+
+	def busy(self) -> bool:
+		return self.thread is not None and self.thread.is_alive()
+
+	'''
+	* Starts a job unless one is already running
+	*
+	* on_progress: called on the Tk thread with the latest progress text
+	* on_done: called on the Tk thread with the job's result, or None if
+	*          the job was cancelled or failed
+	*
+	* return: False if another job is still running
+	'''
+
+	def start(self, job, on_progress, on_done) -> bool:
+		if self.busy():
+			return False
+		self.cancel_event.clear()
+		self.on_progress = on_progress
+		self.on_done = on_done
+		self.thread = threading.Thread(target=self.run, args=(job,), daemon=True)
+		self.thread.start()
+		self.widget.after(POLL_INTERVAL, self.poll)
+		return True
+
+	def run(self, job):
+		try:
+			result = job(lambda text: self.messages.put(("progress", text)), self.cancel_event.is_set)
+			self.messages.put(("done", None if self.cancel_event.is_set() else result))
+		except Exception as error:
+			self.messages.put(("error", error))
+
+	def cancel(self):
+		self.cancel_event.set()
+
+	def poll(self):
+		progress = None
+		while True:
+			try:
+				(kind, payload) = self.messages.get_nowait()
+			except queue.Empty:
+				break
+			if kind == "progress":
+				progress = payload
+				continue
+			if kind == "error":
+				self.on_progress("Error: {}".format(payload))
+				payload = None
+			elif payload is None:
+				self.on_progress("Cancelled.")
+			self.on_done(payload)
+			return
+		if progress is not None:
+			self.on_progress(progress)
+		self.widget.after(POLL_INTERVAL, self.poll)
 
 
 '''
@@ -222,6 +444,7 @@ def main_tableau():
 class GUI(tk.Frame):
 	def __init__(self, *args, **kwargs):
 		tk.Frame.__init__(self, *args, **kwargs)
+		self.worker = SolveWorker(self)
 		self.matrixAnalysisButton = tk.Button(self, text="Matrix Analysis", command=self.matrixAnalysis)
 		self.matrixAnalysisButton.pack(side="top")
 
@@ -247,49 +470,137 @@ class GUI(tk.Frame):
 		row_label.grid(row=0, column=0)
 		column_label = tk.Label(self.subwindow, text="Columns:")
 		column_label.grid(row=1, column=0)
+		self.backend_var = tk.StringVar(self, simplex.TABLEAU_BACKENDS[0])
+		backend_entry = tk.OptionMenu(self.subwindow, self.backend_var, *simplex.TABLEAU_BACKENDS)
+		backend_entry.grid(column=1, row=2, sticky="n")
+		backend_label = tk.Label(self.subwindow, text="Backend:")
+		backend_label.grid(row=2, column=0, sticky="n")
+		self.rule_var = tk.StringVar(self, "dantzig")
+		rule_entry = tk.OptionMenu(self.subwindow, self.rule_var, *simplex.PIVOT_RULES)
+		rule_entry.grid(column=1, row=3, sticky="n")
+		rule_label = tk.Label(self.subwindow, text="Pivot rule:")
+		rule_label.grid(row=3, column=0, sticky="n")
 		button_grid = tk.Frame(self.subwindow)
 		button_grid.grid(row=0, column=2)
-		#graphic_button = tk.Button(button_grid, text="Solve\nGraphically", command=self.solveGraphically)
-		#graphic_button.grid(row=0, column=0)
+		graphic_button = tk.Button(button_grid, text="Solve\nGraphically", command=self.solveGraphically)
+		graphic_button.grid(row=0, column=0)
 		saddle_point_button = tk.Button(button_grid, text="Search for\nSaddle Points", command=self.findSaddle)
 		saddle_point_button.grid(row=0, column=1)
 		simplex_button = tk.Button(button_grid, text="Solve with\nSimplex method", command=self.solveWithSimplex)
 		simplex_button.grid(row=1, column=0)
 		strats_button = tk.Button(button_grid, text="Find strategies\nand game value", command=self.findStrats)
 		strats_button.grid(row=1, column=1)
+		cancel_button = tk.Button(button_grid, text="Cancel", command=self.worker.cancel)
+		cancel_button.grid(row=2, column=0, columnspan=2)
 		self.buttons_label = tk.Label(button_grid, text="Enter the numbers of rows and columns using\nthe dropdowns "
 		                                                "to the left, enter the matrix\nbelow, then press one of"
 		                                                " these buttons!")
 		self.buttons_label.grid(column=2, row=0, columnspan=2, rowspan=2)
 
 	def solveGraphically(self):
-		self.buttons_label.config(text="Not implemented\nyet.")
-		return
-		print("GRAPHICS")
-		print(self.text_entry.get(0.0, tk.END))
-		start = self.getTableau()
-		if type(start) != Tableau:
+		payoff = self.getPayoff()
+		if payoff == -1:
 			return
+		m = len(payoff)
+		n = len(payoff[0])
+		if m != 2 and n != 2:
+			self.buttons_label.config(text="Graphical solutions need a game\nwith 2 rows or 2 columns.")
+			return
+		(lines, upper) = graphical.strategy_lines(payoff, m, n)
+		solution = graphical.solve_graphically(payoff, m, n)
+		self.showStrats(solution)
+		self.drawEnvelope(lines, upper, solution)
+
+	'''
+	* Plots every strategy line over [0, 1] with the envelope the player
+	* with two strategies optimizes drawn over them, and marks the optimum
+	*
+	* lines: (intercept, slope) pairs from graphical.strategy_lines
+	* upper: the envelope is the upper one (m x 2 games)
+	* solution: (player 1 strategy, player 2 strategy, value)
+	'''
+
+	def drawEnvelope(self, lines, upper, solution):
+		window = tk.Toplevel(self)
+		window.wm_title("Graphical solution")
+		canvas = tk.Canvas(window, width=PLOT_WIDTH, height=PLOT_HEIGHT, background="white")
+		canvas.pack(side="top", fill="both", expand=True)
+
+		ends = [float(intercept) for (intercept, _) in lines] + [float(intercept + slope) for (intercept, slope) in lines]
+		(low, high) = (min(ends), max(ends))
+		if high == low:
+			high = low + 1
+
+		def point(x, y):
+			px = PLOT_MARGIN + float(x) * (PLOT_WIDTH - 2 * PLOT_MARGIN)
+			py = PLOT_HEIGHT - PLOT_MARGIN - (float(y) - low) / (high - low) * (PLOT_HEIGHT - 2 * PLOT_MARGIN)
+			return (px, py)
+
+		canvas.create_line(*point(0, low), *point(1, low))
+		canvas.create_line(*point(0, low), *point(0, high))
+		canvas.create_line(*point(1, low), *point(1, high))
+		axis = "P(column 1)" if upper else "P(row 1)"
+		canvas.create_text(*point(0, low), text="0", anchor="n")
+		canvas.create_text(*point(1, low), text="1", anchor="n")
+		canvas.create_text(PLOT_WIDTH / 2, PLOT_HEIGHT - PLOT_MARGIN / 2, text=axis)
+		for index, (intercept, slope) in enumerate(lines):
+			canvas.create_line(*point(0, intercept), *point(1, intercept + slope), fill="gray")
+			label = "{} {}".format("row" if upper else "column", index + 1)
+			canvas.create_text(*point(1, intercept + slope), text=label, anchor="w", fill="gray")
+
+		sign = -1 if upper else 1
+		pieces = graphical.lower_envelope([(sign * intercept, sign * slope) for (intercept, slope) in lines])
+		for (start, end, index) in pieces:
+			(intercept, slope) = lines[index]
+			canvas.create_line(*point(start, intercept + start * slope), *point(end, intercept + end * slope),
+								fill="blue", width=3)
+
+		(p1_strategy, p2_strategy, value) = solution
+		x = p2_strategy[0] if upper else p1_strategy[0]
+		(px, py) = point(x, value)
+		canvas.create_oval(px - 5, py - 5, px + 5, py + 5, fill="red")
+		canvas.create_text(px, py - 8, text="value {}".format(simplex.format_value(value)), anchor="s")
+
+	def showProgress(self, text):
+		self.buttons_label.config(text=text)
+
+	def startJob(self, job, on_done):
+		if not self.worker.start(job, self.showProgress, on_done):
+			self.buttons_label.config(text="Still working on the last request.\nPress Cancel to stop it.")
 
 	def findStrats(self):
-		tableau = self.getTableau()
-		for x in range(1000):
-			tableau.pivot_tableau()
-		v = tableau.m[tableau.rows - 1][tableau.cols - 1]
-		#value = (1 / v) - tableau.k
-		order = [-1] * (tableau.cols - tableau.rows)
-		v = tableau.m[tableau.rows - 1][tableau.cols - 1]
-		if (v!= 0):
-			value = (1 / v) - tableau.k
-		else:
-			value = -tableau.k
-		m = tableau.rows - 1
-		n = tableau.cols - tableau.rows
-		p1_strategy = [tableau.m[tableau.rows - 1][n + col] / v for col in range(m)]
-		p2_strategy = [tableau.m[-1][index + n] / v for index in range(n)]
-		new_text = "Player 1 Optimal Strategy: (" + ", ".join(format_frac(p) for p in p1_strategy) + ")"
-		new_text += "\nPlayer 2 Optimal Strategy: (" + ", ".join(format_frac(q) for q in p2_strategy) + ")"
-		new_text += "\nValue: {}".format(format_frac(value))
+		payoff = self.getPayoff()
+		if payoff == -1:
+			return
+		m = len(payoff)
+		n = len(payoff[0])
+		backend = self.backend_var.get()
+		# built here since reading the dropdowns must happen on the Tk thread
+		tableau = self.getTableau(payoff)
+
+		def job(report, cancelled):
+			saddles = simplex.find_saddles(payoff, m, n)
+			if saddles:
+				return simplex.saddle_strategies(saddles[0], m, n, backend)
+			if m == 2 or n == 2:
+				return simplex.graphical_strategies(payoff, m, n, backend)
+			pivots = 0
+			while not cancelled() and tableau.pivot_tableau() is not None:
+				pivots += 1
+				report("Pivot {}, objective {}".format(pivots, simplex.format_value(simplex.tableau_objective(tableau))))
+			if cancelled():
+				return None
+			return simplex.get_strategies(tableau)
+
+		self.startJob(job, self.showStrats)
+
+	def showStrats(self, result):
+		if result is None:
+			return
+		(p1_strategy, p2_strategy, value) = result
+		new_text = "Player 1 Optimal Strategy: (" + ", ".join(simplex.format_value(p) for p in p1_strategy) + ")"
+		new_text += "\nPlayer 2 Optimal Strategy: (" + ", ".join(simplex.format_value(q) for q in p2_strategy) + ")"
+		new_text += "\nValue: {}".format(simplex.format_value(value))
 		self.buttons_label.config(text=new_text)
 		#print("\n)
 		#print("Player 2 Optimal Strategy: (", ", ".join(format_frac(q) for q in p2_strategy), ")")
@@ -297,40 +608,39 @@ class GUI(tk.Frame):
 
 	def solveWithSimplex(self):
 		tableau = self.getTableau()
-		if type(tableau) != Tableau:
+		if not isinstance(tableau, (Tableau, FloatTableau, ExactTableau)):
 			return
 		simplex_window = tk.Toplevel(self)
 		simplex_window.wm_title("Simplex Solution")
 		simplex_display = tk.Label(simplex_window, text=tableau.__str__())
 		simplex_display.grid(row=1, column=0, columnspan=2)
 		simplex_display.config(text=tableau.__str__())
-		# lbutton = tk.Button(simplex_window, text="Previous\nPivot", command=lambda )
-		# lbutton.grid(row=0, column=0)
-		rbutton = tk.Button(simplex_window, text="Next\nPivot", command=lambda: [self.nextPivot(tableau, simplex_display)])
+		history = PivotHistory(tableau)
+		lbutton = tk.Button(simplex_window, text="Previous\nPivot", command=lambda: [self.previousPivot(history, simplex_display)])
+		lbutton.grid(row=0, column=0)
+		rbutton = tk.Button(simplex_window, text="Next\nPivot", command=lambda: [self.nextPivot(history, simplex_display)])
 		rbutton.grid(row=0, column=1)
 
 	def findSaddle(self):
-		tableau = self.getTableau()
-		if type(tableau) != Tableau:
+		payoff = self.getPayoff()
+		if payoff == -1:
 			print("Tableau error.")
 			return
-		saddle_point_text = "Saddle points:\n"
-		for rownum in range(tableau.rows-1):
-			for columnnum in range(tableau.cols-tableau.rows):
-				entry = tableau.m[rownum][columnnum]
-				if (entry == np.min(tableau.m[rownum][0:tableau.cols-tableau.rows])) and (entry == np.max(np.swapaxes(tableau.m, 0, 1)[columnnum][0:tableau.rows-1])):
-					saddle_point_text += str(entry - tableau.k) + "(" + str(rownum) + "," + str(columnnum) + ")\n"
-		self.buttons_label.config(text=saddle_point_text)
 
+		def job(report, cancelled):
+			saddle_point_text = "Saddle points:\n"
+			for (rownum, columnnum, entry) in simplex.find_saddles(payoff, len(payoff), len(payoff[0])):
+				saddle_point_text += str(entry) + "(" + str(rownum) + "," + str(columnnum) + ")\n"
+			return saddle_point_text
 
+		self.startJob(job, lambda text: text is not None and self.buttons_label.config(text=text))
 
-
-	def getTableau(self):
+	def getPayoff(self):
 		# initialize a mxn numpy array
 		m = self.row_var.get()
 		n = self.column_var.get()
 		text = self.text_entry.get(0.0, tk.END)
-		tableau = Tableau(m, n)
+		payoff = [[Fraction(0)] * n for _ in range(m)]
 		lineNum = 0
 		lines = text.split('\n')
 		while lineNum < m:
@@ -346,7 +656,7 @@ class GUI(tk.Frame):
 			for col in range(0, n):
 				try:
 					num = Fraction(row_els[col])
-					tableau.m[lineNum][col] = num
+					payoff[lineNum][col] = num
 				except ValueError:
 					self.buttons_label.config(text="Couldn't convert input string to fraction.\nMake sure you're only"
 					                               "using integers!")
@@ -354,19 +664,40 @@ class GUI(tk.Frame):
 			# endfor
 			lineNum += 1
 		# endwhile
+		return payoff
+
+	def getTableau(self, payoff=None):
+		if payoff is None:
+			payoff = self.getPayoff()
+			if payoff == -1:
+				return -1
+		m = len(payoff)
+		n = len(payoff[0])
+		if self.backend_var.get() == "float":
+			tableau = simplex.get_init_float_tableau(payoff, m, n, FloatTableau)
+			tableau.rule = simplex.PIVOT_RULES[self.rule_var.get()]()
+			return tableau
+		if self.backend_var.get() == "exact":
+			tableau = simplex.get_init_exact_tableau(payoff, m, n, ExactTableau)
+			tableau.rule = simplex.PIVOT_RULES[self.rule_var.get()]()
+			return tableau
+
 		min = sys.maxsize
 		for row in range(0, m):
 			for col in range(0, n):
-				if tableau.m[row][col] < min:
-					min = tableau.m[row][col]
+				if payoff[row][col] < min:
+					min = payoff[row][col]
 
 		#  Determine constant to add to tableau so all vals are positive
 		k = Fraction(1 - min) if (min < 1) else Fraction(0)
+
+		tableau = Tableau(m, n)
 		tableau.k = k
+		tableau.rule = simplex.PIVOT_RULES[self.rule_var.get()]()
 		for row in range(0, tableau.rows):
 			for col in range(0, tableau.cols):
 				if col < n:
-					tableau.m[row][col] = Fraction(tableau.m[row][col] + k) \
+					tableau.m[row][col] = Fraction(payoff[row][col] + k) \
 						if (row < m) else Fraction(-1)
 				elif col < n + m:
 					tableau.m[row][col] = Fraction((row == col - n)) \
@@ -375,9 +706,20 @@ class GUI(tk.Frame):
 					tableau.m[row][col] = Fraction((row < m))
 		return tableau
 
-	def nextPivot(self, tableau, text):
-		tableau.pivot_tableau()
-		text.config(text=tableau.__str__())
+	def nextPivot(self, history, text):
+		self.stepPivot(history.next, history, text)
+
+	def previousPivot(self, history, text):
+		self.stepPivot(history.previous, history, text)
+
+	def stepPivot(self, step, history, text):
+		# pivoting and formatting a big tableau both happen off the Tk thread
+		def job(report, cancelled):
+			report("Pivoting...")
+			step()
+			return history.tableau.__str__()
+
+		self.startJob(job, lambda rendered: rendered is not None and text.config(text=rendered))
 		# v = tableau.m[tableau.rows - 1][tableau.cols - 1]
 		# value = (1 / v) - tableau.k
 		# n = tableau.cols - tableau.rows
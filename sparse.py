@@ -0,0 +1,321 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+from fractions import Fraction
+from typing import Tuple
+
+import numpy
+
+'''
+ * Payoff matrix in compressed sparse row (CSR) form
+ *
+ * Row i holds the columns indices[indptr[i]:indptr[i+1]], in increasing
+ * order, with the entries data[indptr[i]:indptr[i+1]]; every other entry
+ * is 0. Entries are kept as given (Fractions from get_payoff).
+ *
+ * m: number of rows
+ * n: number of columns
+ * indptr: start of every row in indices and data, length m + 1
+ * indices: column of every stored entry
+ * data: every stored entry
+ '''
+
+
+class SparsePayoff:
+
+	def __init__(self, m, n, indptr, indices, data):
+		self.m = m
+		self.n = n
+		self.indptr = indptr
+		self.indices = indices
+		self.data = data
+
+	@property
+	def shape(self) -> Tuple[int, int]:
+		return (self.m, self.n)
+
+	def nnz(self) -> int:
+		return len(self.data)
+
+	'''
+	* Stored entries of row i
+	*
+	* return: (columns, entries)
+	'''
+
+	def row(self, i):
+		(start, end) = (self.indptr[i], self.indptr[i + 1])
+		return (self.indices[start:end], self.data[start:end])
+
+	'''
+	* The same matrix transposed, which is the CSC form of this one
+	'''
+
+	def transpose(self):
+		columns = [[] for _ in range(self.n)]
+		for i in range(self.m):
+			for (j, entry) in zip(*self.row(i)):
+				columns[j].append((i, entry))
+		return from_rows([dict(column) for column in columns], self.n, self.m)
+
+	def to_dense(self) -> numpy.ndarray:
+		dense = numpy.full((self.m, self.n), Fraction(0), dtype=object)
+		for i in range(self.m):
+			(cols, entries) = self.row(i)
+			dense[i, list(cols)] = entries
+		return dense
+
+
+'''
+ * Builds a SparsePayoff from one {column: entry} dict per row, dropping
+ * zero entries
+ '''
+
+
+def from_rows(rows, m, n) -> SparsePayoff:
+	indptr = [0]
+	indices = []
+	data = []
+	for row in rows:
+		for col in sorted(row):
+			if row[col] != 0:
+				indices.append(col)
+				data.append(row[col])
+		indptr.append(len(indices))
+	return SparsePayoff(m, n, indptr, indices, data)
+
+
+'''
+ * Builds a SparsePayoff from a dense payoff, keeping only its nonzeros as
+ * Python numbers
+ '''
+
+
+def from_dense(payoff, m, n) -> SparsePayoff:
+	lines = numpy.asarray(payoff).reshape(m, n).tolist()
+	return from_rows([{col: entry for (col, entry) in enumerate(line) if entry != 0} for line in lines], m, n)
+
+
+'''
+ * Exact value of a payoff entry; NumPy scalars are turned into Python
+ * numbers first, since a Fraction of a fixed-width integer overflows
+ '''
+
+
+def exact(entry) -> Fraction:
+	if isinstance(entry, numpy.generic):
+		entry = entry.item()
+	return Fraction(entry)
+
+
+'''
+ * Every pure-strategy saddle point of a sparse payoff, like
+ * simplex.find_saddles but without expanding the zeros
+ *
+ * A row missing an entry has 0 among its values, so its minimum is at
+ * most 0, and the same goes for column maxima; an unstored entry is a
+ * saddle point when its row minimum and column maximum are both 0.
+ *
+ * return: list of (row, col, value) in row-major order
+ '''
+
+
+def find_saddles(payoff: SparsePayoff) -> list:
+	(m, n) = payoff.shape
+	zero = Fraction(0)
+	row_min = []
+	col_max = [None] * n
+	col_count = [0] * n
+	for i in range(m):
+		(cols, entries) = payoff.row(i)
+		low = min(entries) if len(entries) > 0 else zero
+		row_min.append(min(low, zero) if len(entries) < n else low)
+		for (j, entry) in zip(cols, entries):
+			col_count[j] += 1
+			if col_max[j] is None or entry > col_max[j]:
+				col_max[j] = entry
+	col_max = [zero if top is None else (max(top, zero) if col_count[j] < m else top) for j, top in enumerate(col_max)]
+	zero_cols = [j for j in range(n) if col_max[j] == 0]
+
+	saddles = []
+	for i in range(m):
+		(cols, entries) = payoff.row(i)
+		found = [(j, entry) for (j, entry) in zip(cols, entries) if entry == row_min[i] and entry == col_max[j]]
+		if row_min[i] == 0 and len(cols) < n:
+			stored = set(cols)
+			found += [(j, zero) for j in zero_cols if j not in stored]
+		saddles += [(i, int(j), entry) for (j, entry) in sorted(found, key=lambda item: item[0])]
+	return saddles
+
+
+'''
+ * Exact simplex solver for the game LP on a sparse tableau
+ *
+ * Solves max sum(x) s.t. (payoff + k) x + s = 1, x, s >= 0 like the
+ * tableau backends, in Fractions, but every row of the tableau is a
+ * {column: entry} dict of its nonzeros and every column remembers the
+ * rows it is nonzero in. A pivot only touches the rows with a nonzero in
+ * the pivot column, and within them only the columns of the pivot row.
+ *
+ * The booster k that makes every entry positive would fill in every zero
+ * of the payoff, so it is skipped when the payoff is nonnegative and
+ * every column has a positive entry: player 1's uniform strategy then
+ * already earns a positive value, which is all the LP needs. Payoffs with
+ * negative entries are boosted as usual and lose their sparsity.
+ *
+ * rows: one {column: entry} dict per constraint row, then the objective
+ * col_rows: set of rows every column is nonzero in
+ * k: booster added to the payoff
+ * basis: basis[row] is the variable basic in that row; variables below
+ *        n are player 2's columns, n + i is the slack of row i
+ * fill_in: entries that became nonzero during pivoting
+ * cycling: a basis repeated and Bland's rule is in use
+ * seen: every basis pivoted from so far
+ '''
+
+
+class SparseSimplex:
+
+	def __init__(self, payoff, m, n):
+		if not isinstance(payoff, SparsePayoff):
+			payoff = from_dense(payoff, m, n)
+		self.m = m
+		self.n = n
+		self.rhs = n + m
+		entries = [exact(entry) for entry in payoff.data]
+		low = min(entries) if entries else Fraction(0)
+		covered = {int(col) for (col, entry) in zip(payoff.indices, entries) if entry > 0}
+		if payoff.nnz() < m * n:
+			low = min(low, Fraction(0))
+		self.k = Fraction(0) if low >= 0 and len(covered) == n else Fraction(1) - low
+
+		self.rows = []
+		for i in range(m):
+			(start, end) = (payoff.indptr[i], payoff.indptr[i + 1])
+			stored = zip(payoff.indices[start:end], entries[start:end])
+			if self.k == 0:
+				row = {int(col): entry for (col, entry) in stored}
+			else:
+				row = {col: self.k for col in range(n)}
+				for (col, entry) in stored:
+					row[int(col)] = entry + self.k
+				row = {col: entry for (col, entry) in row.items() if entry != 0}
+			row[n + i] = Fraction(1)
+			row[self.rhs] = Fraction(1)
+			self.rows.append(row)
+		self.rows.append({col: Fraction(-1) for col in range(n)})
+
+		self.col_rows = [set() for _ in range(self.rhs + 1)]
+		for (i, row) in enumerate(self.rows):
+			for col in row:
+				self.col_rows[col].add(i)
+		self.basis = list(range(n, n + m))
+		self.pivot_count = 0
+		self.fill_in = 0
+		self.cycling = False
+		self.seen = set()
+
+	def nnz(self) -> int:
+		return sum(len(row) for row in self.rows)
+
+	def finished(self) -> bool:
+		return all(entry >= 0 for (col, entry) in self.rows[self.m].items() if col != self.rhs)
+
+	'''
+	* Chooses the next pivot without applying it: Dantzig's most negative
+	* objective entry, switching to Bland's rule for good once a basis
+	* repeats, with the ratio test over the rows nonzero in the column
+	*
+	* return: (pivot_row, entering variable, None), or (-1, -1, None) if
+	*         optimal; the None stands in for revised.RevisedSimplex's
+	*         entering column so both solvers share a solve loop
+	'''
+
+	def select_pivot(self):
+		objective = self.rows[self.m]
+		candidates = [(entry, col) for (col, entry) in objective.items() if col != self.rhs and entry < 0]
+		if not candidates:
+			return (-1, -1, None)
+		if not self.cycling:
+			key = frozenset(self.basis)
+			if key in self.seen:
+				self.cycling = True
+			self.seen.add(key)
+		entering = min(col for (_, col) in candidates) if self.cycling else min(candidates)[1]
+
+		best = None
+		for row in self.col_rows[entering]:
+			entry = self.rows[row].get(entering)
+			if row == self.m or entry <= 0:
+				continue
+			ratio = self.rows[row].get(self.rhs, 0) / entry
+			tie = self.basis[row] if self.cycling else row
+			if best is None or (ratio, tie) < best[:2]:
+				best = (ratio, tie, row)
+		if best is None:
+			raise ValueError("Problem is unbounded in column {}".format(entering))
+		return (best[2], entering, None)
+
+	'''
+	* Pivots on (pivot_row, entering), updating only the rows nonzero in
+	* the entering column and tracking the entries that fill in
+	'''
+
+	def replace(self, pivot_row, entering, w=None):
+		pivot_line = self.rows[pivot_row]
+		pivot_value = pivot_line[entering]
+		for col in pivot_line:
+			pivot_line[col] = pivot_line[col] / pivot_value
+
+		for row in list(self.col_rows[entering]):
+			if row == pivot_row:
+				continue
+			line = self.rows[row]
+			factor = line[entering]
+			for (col, entry) in pivot_line.items():
+				updated = line.get(col, 0) - factor * entry
+				if updated != 0:
+					if col not in line:
+						self.col_rows[col].add(row)
+						self.fill_in += 1
+					line[col] = updated
+				elif col in line:
+					del line[col]
+					self.col_rows[col].discard(row)
+		self.col_rows[entering] = {pivot_row}
+
+		self.basis[pivot_row] = entering
+		self.pivot_count += 1
+
+	'''
+	* Performs one pivot
+	*
+	* return: (pivot_row, entering variable), or (-1, -1) if optimal
+	'''
+
+	def pivot(self) -> Tuple[int, int]:
+		(pivot_row, entering, w) = self.select_pivot()
+		if pivot_row >= 0:
+			self.replace(pivot_row, entering, w)
+		return (pivot_row, entering)
+
+	'''
+	* Current objective, the sum of player 2's unnormalized variables
+	'''
+
+	def objective(self) -> Fraction:
+		return self.rows[self.m].get(self.rhs, Fraction(0))
+
+	'''
+	* Reads the optimal strategies and game value off the final tableau
+	*
+	* return: (player 1 strategy, player 2 strategy, value)
+	'''
+
+	def get_strategies(self) -> Tuple[list, list, Fraction]:
+		v = self.objective()
+		objective = self.rows[self.m]
+		p1_strategy = [objective.get(self.n + row, Fraction(0)) / v for row in range(self.m)]
+		p2_strategy = [Fraction(0)] * self.n
+		for (row, var) in enumerate(self.basis):
+			if var < self.n:
+				p2_strategy[var] = self.rows[row].get(self.rhs, Fraction(0)) / v
+		return (p1_strategy, p2_strategy, 1 / v - self.k)
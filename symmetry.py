@@ -0,0 +1,181 @@
+# Authors: Aidan Lynch, Bryce Gernon, Jim Godin, Ryan Devoe, Sam Ford
+from fractions import Fraction
+
+import numpy
+
+'''
+ * Symmetries of a game that shrink the problem before it is solved
+ *
+ * A skew-symmetric game (A = -A^T) is fair: its value is 0 and a strategy
+ * optimal for one player is optimal for the other. More generally, when
+ * the rows and columns split into classes such that every row of a row
+ * class has the same sum over each column class and every column of a
+ * column class the same sum over each row class (an equitable partition,
+ * which the orbits of any group of row and column permutations fixing the
+ * payoff are), mixing uniformly inside a class loses nothing. The game of
+ * block means then has the same value, and its optimal strategies spread
+ * evenly over their classes are optimal in the original game.
+ '''
+
+'''
+ * Whether a payoff matrix is skew-symmetric, A[i][j] == -A[j][i]
+ '''
+
+
+def is_skew_symmetric(payoff, m, n) -> bool:
+	if m != n:
+		return False
+	values = numpy.asarray(payoff).reshape(m, n)
+	return bool((values == -values.T).all())
+
+
+'''
+ * Result of grouping a game's strategies into symmetry classes
+ *
+ * payoff: block mean of every (row class, column class) pair
+ * row_classes: original rows of every class, in order
+ * col_classes: original columns of every class, in order
+ * m: number of row classes
+ * n: number of column classes
+ * original_m: number of rows before the reduction
+ * original_n: number of columns before the reduction
+ '''
+
+
+class Reduction:
+
+	def __init__(self, payoff, row_classes, col_classes, original_m, original_n):
+		self.payoff = payoff
+		self.row_classes = row_classes
+		self.col_classes = col_classes
+		self.m = len(row_classes)
+		self.n = len(col_classes)
+		self.original_m = original_m
+		self.original_n = original_n
+
+	'''
+	* Spreads strategies of the reduced game evenly over their classes
+	*
+	* return: (player 1 strategy, player 2 strategy)
+	'''
+
+	def expand(self, p1_strategy, p2_strategy):
+		zero = p1_strategy[0] * 0
+		p1_full = [zero] * self.original_m
+		p2_full = [zero] * self.original_n
+		for (rows, p) in zip(self.row_classes, p1_strategy):
+			for row in rows:
+				p1_full[row] = p / len(rows)
+		for (cols, q) in zip(self.col_classes, p2_strategy):
+			for col in cols:
+				p2_full[col] = q / len(cols)
+		return (p1_full, p2_full)
+
+
+'''
+ * Splits lines into classes by the key of every line, keeping the classes
+ * in order of their first line
+ *
+ * return: list of classes, each a list of line indices
+ '''
+
+
+def split_classes(keys) -> list:
+	classes = {}
+	for line, key in enumerate(keys):
+		classes.setdefault(key, []).append(line)
+	return list(classes.values())
+
+
+'''
+ * Label of every line from a list of classes
+ '''
+
+
+def class_labels(classes, size) -> numpy.ndarray:
+	labels = numpy.empty(size, dtype=numpy.int64)
+	for label, lines in enumerate(classes):
+		labels[lines] = label
+	return labels
+
+
+'''
+ * Coarsest equitable partition of the rows and columns of a matrix
+ *
+ * Starts from one class of rows and one of columns and splits every class
+ * by the sums its lines have over the other player's classes until no
+ * class splits (colour refinement), O(m*n) per round.
+ *
+ * values: m x n matrix, exact (integer or Fraction) unless the caller
+ *         only wants candidates
+ *
+ * return: (row classes, column classes)
+ '''
+
+
+def refine(values) -> tuple:
+	(m, n) = values.shape
+	row_classes = [list(range(m))]
+	col_classes = [list(range(n))]
+	while True:
+		col_indicator = numpy.zeros((n, len(col_classes)), dtype=numpy.int64)
+		col_indicator[numpy.arange(n), class_labels(col_classes, n)] = 1
+		row_indicator = numpy.zeros((m, len(row_classes)), dtype=numpy.int64)
+		row_indicator[numpy.arange(m), class_labels(row_classes, m)] = 1
+		row_sums = values.dot(col_indicator)
+		col_sums = values.T.dot(row_indicator)
+
+		# each new class stays inside its old one, so the old label leads the key
+		row_labels = class_labels(row_classes, m)
+		col_labels = class_labels(col_classes, n)
+		new_rows = split_classes((row_labels[row],) + tuple(row_sums[row]) for row in range(m))
+		new_cols = split_classes((col_labels[col],) + tuple(col_sums[col]) for col in range(n))
+		if len(new_rows) == len(row_classes) and len(new_cols) == len(col_classes):
+			return (row_classes, col_classes)
+		(row_classes, col_classes) = (new_rows, new_cols)
+		if len(row_classes) == m and len(col_classes) == n:
+			return (row_classes, col_classes)
+
+
+'''
+ * Groups a game's rows and columns into the classes of its coarsest
+ * equitable partition and builds the game of block means
+ *
+ * Float payoffs are refined in floats first, which is cheap, and only
+ * when that finds a class with more than one line refined again in exact
+ * Fractions, so rounding can never merge lines that differ.
+ *
+ * payoff: payoff matrix, integer, float or holding Fractions
+ * m: number of rows
+ * n: number of columns
+ *
+ * return: Reduction, None when every class holds a single line
+ '''
+
+
+def reduce_symmetric(payoff, m, n):
+	values = numpy.asarray(payoff).reshape(m, n)
+	if values.dtype.kind in "ub":
+		values = values.astype(numpy.int64)
+	(row_classes, col_classes) = refine(values)
+	if len(row_classes) == m and len(col_classes) == n:
+		return None
+
+	if values.dtype.kind == "f":
+		values = numpy.array([[Fraction(entry) for entry in row] for row in values.tolist()], dtype=object)
+		(row_classes, col_classes) = refine(values)
+		if len(row_classes) == m and len(col_classes) == n:
+			return None
+		values = numpy.asarray(payoff).reshape(m, n)
+
+	block = numpy.empty((len(row_classes), len(col_classes)), dtype=object)
+	for (a, rows) in enumerate(row_classes):
+		for (b, cols) in enumerate(col_classes):
+			total = values[numpy.ix_(rows, cols)].sum()
+			if values.dtype.kind == "f":
+				block[a, b] = float(total) / (len(rows) * len(cols))
+			else:
+				block[a, b] = Fraction(total) / (len(rows) * len(cols))
+	if values.dtype.kind == "f":
+		block = block.astype(numpy.float64)
+	return Reduction(block, row_classes, col_classes, m, n)